@@ -8,16 +8,27 @@ import asyncpg
 from app.adapters.calendar.base import CalendarAdapter
 
 
-async def get_calendar_adapter(conn: asyncpg.Connection, tenant_id: str) -> CalendarAdapter:
-    """Return a CalendarAdapter for the tenant's configured calendar provider."""
+async def get_calendar_adapter(
+    conn: asyncpg.Connection,
+    tenant_id: str,
+    tenant: dict[str, Any] | None = None,
+    credentials: dict[str, dict[str, Any]] | None = None,
+) -> CalendarAdapter:
+    """
+    Return a CalendarAdapter for the tenant's configured calendar provider.
+
+    Callers that have already loaded the tenant row and/or its credentials can
+    pass them in so neither the factory nor the adapter reloads them.
+    """
     from app.bot.tenants import load_tenant
 
-    tenant = await load_tenant(conn, tenant_id)
+    if tenant is None:
+        tenant = await load_tenant(conn, tenant_id)
     provider = tenant.get("calendar_adapter", "ghl")
 
     if provider == "hubspot":
         from app.adapters.calendar.hubspot import HubSpotCalendarAdapter
-        return HubSpotCalendarAdapter(conn, tenant_id)
+        return HubSpotCalendarAdapter(conn, tenant_id, tenant=tenant, credentials=credentials)
 
     from app.adapters.calendar.ghl import GHLCalendarAdapter
-    return GHLCalendarAdapter(conn, tenant_id)
+    return GHLCalendarAdapter(conn, tenant_id, tenant=tenant, credentials=credentials)
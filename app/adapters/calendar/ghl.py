@@ -12,6 +12,8 @@ from app.adapters.calendar.slots import get_stub_slots
 
 BASE_URL = "https://services.leadconnectorhq.com"
 
+_UTC = ZoneInfo("UTC")
+
 
 async def get_free_slots(
     access_token: str,
@@ -186,7 +188,7 @@ async def book_slot(
         # Parse slot times
         slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
         if slot_dt.tzinfo is None:
-            slot_dt = slot_dt.replace(tzinfo=ZoneInfo("UTC"))
+            slot_dt = slot_dt.replace(tzinfo=_UTC)
         slot_duration = int(cal.get("slot_duration_minutes") or 60)
         end_dt = slot_dt + timedelta(minutes=slot_duration)
 
@@ -349,22 +351,32 @@ async def cancel_booking(
 class GHLCalendarAdapter:
     """GHL calendar adapter. Handles credential loading internally."""
 
-    def __init__(self, conn: Any, tenant_id: str):
+    def __init__(
+        self,
+        conn: Any,
+        tenant_id: str,
+        tenant: dict[str, Any] | None = None,
+        credentials: dict[str, dict[str, Any]] | None = None,
+    ):
         self.conn = conn
         self.tenant_id = tenant_id
+        self.tenant = tenant  # preloaded tenant row (get_free_slots only)
+        self.credentials = credentials  # preloaded credentials (get_free_slots only)
 
     async def get_free_slots(
         self, *, start_dt: datetime, end_dt: datetime, timezone: str
     ) -> tuple[list[str], str | None]:
         from app.bot.tenants import load_tenant, load_tenant_credentials, get_calendar_settings
 
-        tenant = await load_tenant(self.conn, self.tenant_id)
+        tenant = self.tenant or await load_tenant(self.conn, self.tenant_id)
         cal = get_calendar_settings(tenant)
         calendar_id = cal.get("calendar_id")
         if not calendar_id:
             return [], None
 
-        credentials = await load_tenant_credentials(self.conn, self.tenant_id, provider="ghl")
+        credentials = self.credentials
+        if credentials is None:
+            credentials = await load_tenant_credentials(self.conn, self.tenant_id, provider="ghl")
         ghl_creds = credentials.get("ghl", {})
         access_token = ghl_creds.get("access_token")
         if not access_token:
@@ -65,9 +65,17 @@ async def _hubspot_request(
 class HubSpotCalendarAdapter:
     """Calendar adapter for HubSpot Scheduler API."""
 
-    def __init__(self, conn: Any, tenant_id: str):
+    def __init__(
+        self,
+        conn: Any,
+        tenant_id: str,
+        tenant: dict[str, Any] | None = None,
+        credentials: dict[str, dict[str, Any]] | None = None,
+    ):
         self.conn = conn
         self.tenant_id = tenant_id
+        self.tenant = tenant  # preloaded tenant row (get_free_slots only)
+        self.credentials = credentials  # preloaded credentials (get_free_slots only)
 
     async def get_free_slots(
         self, *, start_dt: datetime, end_dt: datetime, timezone: str
@@ -80,14 +88,16 @@ class HubSpotCalendarAdapter:
 
         from app.bot.tenants import load_tenant, load_tenant_credentials, get_calendar_settings
 
-        tenant = await load_tenant(self.conn, self.tenant_id)
+        tenant = self.tenant or await load_tenant(self.conn, self.tenant_id)
         cal = get_calendar_settings(tenant)
         meeting_link_slug = cal.get("calendar_id")  # stored in calendar_id field
         if not meeting_link_slug:
             logger.error("No meeting_link_slug (calendar_id) for tenant %s", self.tenant_id)
             return [], None
 
-        credentials = await load_tenant_credentials(self.conn, self.tenant_id, provider="hubspot")
+        credentials = self.credentials
+        if credentials is None:
+            credentials = await load_tenant_credentials(self.conn, self.tenant_id, provider="hubspot")
         hs_creds = credentials.get("hubspot", {})
         access_token = hs_creds.get("access_token")
         if not access_token:
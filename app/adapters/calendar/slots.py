@@ -9,8 +9,30 @@ from __future__ import annotations
 import json
 import os
 from datetime import datetime, timedelta
+from functools import lru_cache
 from zoneinfo import ZoneInfo
 
+# Tenant timezones are a handful of names; resolve each once
+_tz = lru_cache(maxsize=32)(ZoneInfo)
+_UTC = ZoneInfo("UTC")
+
+
+@lru_cache(maxsize=4096)
+def _parse_slot_utc(slot_iso: str) -> datetime | None:
+    """
+    Parse a slot ISO string to an aware datetime (naive = UTC); None if malformed.
+
+    Cached because the same calendar slots go through availability filtering,
+    signal filtering, picking and display formatting for every offer.
+    """
+    try:
+        slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if slot_dt.tzinfo is None:
+        slot_dt = slot_dt.replace(tzinfo=_UTC)
+    return slot_dt
+
 
 def get_stub_slots() -> list[str] | None:
     """
@@ -50,8 +72,7 @@ def filter_slots_by_signals(
     Slots are ISO strings in UTC (e.g., "2026-01-30T00:00:00Z").
     Filtering is done in tenant timezone, returns original ISO strings sorted chronologically.
     """
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
+    tz = _tz(timezone)
     now = datetime.now(tz)
 
     # Map day names to weekday integers (0=Monday)
@@ -70,15 +91,11 @@ def filter_slots_by_signals(
     # Parse and convert slots to tenant timezone for filtering
     filtered: list[tuple[datetime, str]] = []
     for slot_iso in slots:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            # Ensure timezone-aware (assume UTC if naive)
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            # Convert to tenant timezone for filtering
-            slot_local = slot_dt.astimezone(tz)
-        except ValueError:
+        slot_dt = _parse_slot_utc(slot_iso)
+        if slot_dt is None:
             continue
+        # Convert to tenant timezone for filtering
+        slot_local = slot_dt.astimezone(tz)
 
         # Filter by day (using local date)
         if day:
@@ -128,18 +145,13 @@ def pick_soonest_two_slots(
     if not slots:
         return []
 
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
+    tz = _tz(timezone)
 
     def parse_slot(slot_iso: str) -> tuple[datetime, datetime, str] | None:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            local_dt = slot_dt.astimezone(tz)
-            return (slot_dt, local_dt, slot_iso)
-        except ValueError:
+        slot_dt = _parse_slot_utc(slot_iso)
+        if slot_dt is None:
             return None
+        return (slot_dt, slot_dt.astimezone(tz), slot_iso)
 
     def get_time_category(local_dt: datetime) -> str:
         hour = local_dt.hour
@@ -166,7 +178,7 @@ def pick_soonest_two_slots(
     if target_hour is not None:
         parsed.sort(key=lambda x: abs(x[1].hour + x[1].minute / 60 - target_hour))
         result = [iso for _, _, iso in parsed[:2]]
-        result_parsed = [(datetime.fromisoformat(iso.replace("Z", "+00:00")), iso) for iso in result]
+        result_parsed = [(_parse_slot_utc(iso), iso) for iso in result]
         result_parsed.sort(key=lambda x: x[0])
         return [iso for _, iso in result_parsed]
 
@@ -207,7 +219,7 @@ def pick_soonest_two_slots(
     if slot_b_iso:
         # Sort A and B chronologically
         result = [slot_a_iso, slot_b_iso]
-        result_parsed = [(datetime.fromisoformat(iso.replace("Z", "+00:00")), iso) for iso in result]
+        result_parsed = [(_parse_slot_utc(iso), iso) for iso in result]
         result_parsed.sort(key=lambda x: x[0])
         return [iso for _, iso in result_parsed]
 
@@ -222,19 +234,14 @@ def format_slots_for_display(slots: list[str], timezone: str = "Europe/London")
     Slots are UTC ISO strings (e.g., "2026-01-30T14:00:00Z").
     Output: "Friday 09:00" in tenant local time.
     """
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
+    tz = _tz(timezone)
     formatted: list[str] = []
     for slot_iso in slots:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            # Convert to tenant local time for display
-            local_dt = slot_dt.astimezone(tz)
-            formatted.append(local_dt.strftime("%A %H:%M"))
-        except ValueError:
+        slot_dt = _parse_slot_utc(slot_iso)
+        if slot_dt is None:
             continue
+        # Convert to tenant local time for display
+        formatted.append(slot_dt.astimezone(tz).strftime("%A %H:%M"))
     return formatted
 
 
@@ -259,8 +266,7 @@ def filter_by_availability_windows(
     if not availability:
         return slots
 
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
+    tz = _tz(timezone)
 
     day_abbrev = {
         0: "mon", 1: "tue", 2: "wed", 3: "thu",
@@ -269,13 +275,10 @@ def filter_by_availability_windows(
 
     filtered: list[tuple[datetime, str]] = []
     for slot_iso in slots:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            local_dt = slot_dt.astimezone(tz)
-        except ValueError:
+        slot_dt = _parse_slot_utc(slot_iso)
+        if slot_dt is None:
             continue
+        local_dt = slot_dt.astimezone(tz)
 
         # Get day abbreviation
         day_key = day_abbrev.get(local_dt.weekday())
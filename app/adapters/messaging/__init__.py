@@ -8,11 +8,21 @@ import asyncpg
 from app.adapters.messaging.base import MessagingAdapter
 
 
-async def get_messaging_adapter(conn: asyncpg.Connection, tenant_id: str) -> MessagingAdapter:
-    """Return a MessagingAdapter for the tenant's configured messaging provider."""
+async def get_messaging_adapter(
+    conn: asyncpg.Connection,
+    tenant_id: str,
+    tenant: dict[str, Any] | None = None,
+) -> MessagingAdapter:
+    """
+    Return a MessagingAdapter for the tenant's configured messaging provider.
+
+    Callers that have already loaded the tenant row can pass it in so the
+    factory doesn't reload it.
+    """
     from app.bot.tenants import load_tenant
 
-    tenant = await load_tenant(conn, tenant_id)
+    if tenant is None:
+        tenant = await load_tenant(conn, tenant_id)
     provider = tenant.get("messaging_adapter", "ghl")
 
     if provider == "twilio":
@@ -4,6 +4,8 @@ from typing import Any
 import asyncpg
 import json
 
+from app.db import prepared, register_prepared
+
 @dataclass
 class ClaimedJob:
     job_id: str
@@ -60,11 +62,11 @@ WHERE job_id = $1::uuid;
 """
 
 async def claim_jobs(conn: asyncpg.Connection, limit: int, locked_by: str) -> list[ClaimedJob]:
-    rows = await conn.fetch(CLAIM_JOBS_SQL, limit, locked_by)
+    rows = await (await prepared(conn, CLAIM_JOBS_SQL)).fetch(limit, locked_by)
     return [ClaimedJob(**dict(r)) for r in rows]
 
 async def mark_done(conn: asyncpg.Connection, job_id: str) -> None:
-    await conn.execute(MARK_DONE_SQL, job_id)
+    await (await prepared(conn, MARK_DONE_SQL)).fetchval(job_id)
 
 async def mark_retry(conn: asyncpg.Connection, job_id: str, delay_seconds: int, error_obj: dict[str, Any]) -> None:
     await conn.execute(MARK_RETRY_SQL, job_id, delay_seconds, json.dumps(error_obj, ensure_ascii=False))
@@ -97,6 +99,9 @@ SET status = 'done',
 WHERE job_id = ANY($1::uuid[]);
 """
 
+# Run for every claimed batch / processed job
+register_prepared(CLAIM_JOBS_SQL, MARK_DONE_SQL, FIND_SIBLING_JOBS_SQL)
+
 
 async def find_and_claim_siblings(
     conn: asyncpg.Connection,
@@ -109,7 +114,7 @@ async def find_and_claim_siblings(
     Returns list of {job_id, inbound_event_id, text} for sibling messages.
     The sibling jobs are locked (FOR UPDATE) so no other worker grabs them.
     """
-    rows = await conn.fetch(FIND_SIBLING_JOBS_SQL, tenant_id, current_job_id, channel_address)
+    rows = await (await prepared(conn, FIND_SIBLING_JOBS_SQL)).fetch(tenant_id, current_job_id, channel_address)
     return [dict(r) for r in rows]
 
 
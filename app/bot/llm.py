@@ -6,10 +6,21 @@ Provides:
 - Confirmation intent classification (detect user agreement)
 """
 from __future__ import annotations
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any, Optional
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+import asyncio
+import logging
 import os
+import random
 import re
+import string
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
 
 
 # --- Prompts ---
@@ -50,9 +61,162 @@ Reply "yes" or "no":""",
 # --- Core LLM caller ---
 
 _CLAUDE_FALLBACK_MODEL = "claude-sonnet-4-6"
-_OVERLOAD_STATUS_CODES = {529, 503, 529}
-_MAX_RETRIES = 2
-_RETRY_DELAY_SECONDS = 1.5
+
+# Transient failures (rate limits, 5xx, Anthropic overload, connection errors)
+# are retried up to this many attempts, honouring Retry-After when present
+_RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504, 529}
+_RETRY_MAX_ATTEMPTS = 3
+_RETRY_BASE_DELAY_SECONDS = 0.5
+_RETRY_MAX_DELAY_SECONDS = 30.0
+
+
+class _TokenBucket:
+    """
+    Tokens-per-minute budget shared by every call to one provider.
+
+    Refills continuously at tpm/60 tokens per second. A tpm of 0 disables
+    the bucket (acquire returns immediately).
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(max(tokens_per_minute, 0))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: int) -> None:
+        if self.capacity <= 0:
+            return
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+# Per-provider concurrency caps + TPM budgets (size to the account's rate limits)
+_OPENAI_SEMA = asyncio.Semaphore(int(os.getenv("OPENAI_MAX_CONCURRENCY", "20")))
+_ANTHROPIC_SEMA = asyncio.Semaphore(int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "20")))
+_GROQ_SEMA = asyncio.Semaphore(int(os.getenv("GROQ_MAX_CONCURRENCY", "20")))
+_OPENAI_TPM = _TokenBucket(int(os.getenv("OPENAI_TPM_LIMIT", "0")))
+_ANTHROPIC_TPM = _TokenBucket(int(os.getenv("ANTHROPIC_TPM_LIMIT", "0")))
+_GROQ_TPM = _TokenBucket(int(os.getenv("GROQ_TPM_LIMIT", "0")))
+
+# Shared HTTP/2 client — concurrent calls multiplex over one connection per provider
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the module-level LLM HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+    return _client
+
+
+async def close_llm_client() -> None:
+    """Close the shared LLM HTTP client (call on shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Failure warnings are sampled: at most one line per error class per second,
+# so a provider incident doesn't flood the log from every in-flight call
+_LOG_SAMPLE_INTERVAL_SECONDS = 1.0
+_last_log_ts: dict[str, float] = {}
+
+
+def _warn_sampled(error_class: str, msg: str, *args: Any) -> None:
+    now = time.monotonic()
+    if now - _last_log_ts.get(error_class, 0.0) < _LOG_SAMPLE_INTERVAL_SECONDS:
+        return
+    _last_log_ts[error_class] = now
+    logger.warning(msg, *args)
+
+
+def _error_class(e: BaseException) -> str:
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"http_{e.response.status_code}"
+    return type(e).__name__
+
+
+def _estimate_tokens(system: str, user: str, max_tokens: int) -> int:
+    """Rough request cost for the TPM budget: ~4 chars per prompt token + completion cap."""
+    return (len(system) + len(user)) // 4 + max_tokens
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter: 0.5s, 1s, 2s ... plus up to 0.25s."""
+    return _RETRY_BASE_DELAY_SECONDS * (2 ** attempt) + random.random() * 0.25
+
+
+def _retry_after_seconds(resp: httpx.Response, attempt: int) -> float:
+    """Delay before retrying a response: Retry-After header if present, else backoff."""
+    header = resp.headers.get("retry-after")
+    if header:
+        try:
+            return min(max(float(header), 0.0), _RETRY_MAX_DELAY_SECONDS)
+        except ValueError:
+            pass
+    return _backoff_seconds(attempt)
+
+
+async def _post_with_retry(
+    url: str,
+    headers: dict[str, str],
+    payload: dict[str, Any],
+    timeout: float,
+    sema: asyncio.Semaphore,
+    bucket: _TokenBucket,
+    estimated_tokens: int,
+) -> httpx.Response:
+    """
+    POST under the provider's concurrency cap and TPM budget.
+
+    Transport errors (connection resets, timeouts) and 429/5xx responses are
+    retried up to _RETRY_MAX_ATTEMPTS times with backoff; the semaphore is
+    released while sleeping. On the final attempt the transport error is
+    raised, or the response is returned as-is for the caller to raise on.
+    """
+    model = payload.get("model")
+    for attempt in range(_RETRY_MAX_ATTEMPTS):
+        last_attempt = attempt == _RETRY_MAX_ATTEMPTS - 1
+        await bucket.acquire(estimated_tokens)
+        try:
+            async with sema:
+                resp = await _get_client().post(url, headers=headers, json=payload, timeout=timeout)
+        except httpx.TransportError as e:
+            if last_attempt:
+                raise
+            delay = _backoff_seconds(attempt)
+            _warn_sampled(
+                f"retry_{type(e).__name__}",
+                "LLM transport error (%s, attempt %d): %r — retrying in %.1fs",
+                model, attempt + 1, e, delay,
+            )
+            await asyncio.sleep(delay)
+            continue
+        if resp.status_code not in _RETRYABLE_STATUS_CODES or last_attempt:
+            return resp
+        delay = _retry_after_seconds(resp, attempt)
+        _warn_sampled(
+            f"retry_http_{resp.status_code}",
+            "LLM call got %d (%s, attempt %d): retrying in %.1fs",
+            resp.status_code, model, attempt + 1, delay,
+        )
+        await asyncio.sleep(delay)
+    return resp
 
 
 async def _call_anthropic(
@@ -64,12 +228,13 @@ async def _call_anthropic(
     timeout: float,
 ) -> Optional[str]:
     """
-    Call Anthropic API with retry on overload (529/503) and fallback to sonnet.
+    Call Anthropic API (transient errors retried by _post_with_retry) with
+    fallback to sonnet.
+
+    The system prompt is sent as a cache_control block so the provider can reuse
+    its prefix across turns (ignored by the API below the minimum cacheable size).
     Returns response text or None on failure.
     """
-    import asyncio
-    import httpx
-
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         return None
@@ -78,41 +243,46 @@ async def _call_anthropic(
     if model != _CLAUDE_FALLBACK_MODEL:
         models_to_try.append(_CLAUDE_FALLBACK_MODEL)
 
+    estimated_tokens = _estimate_tokens(system, user, max_tokens)
+
     for attempt_model in models_to_try:
-        for attempt in range(_MAX_RETRIES + 1):
-            try:
-                async with httpx.AsyncClient(timeout=timeout) as client:
-                    resp = await client.post(
-                        "https://api.anthropic.com/v1/messages",
-                        headers={
-                            "x-api-key": api_key,
-                            "anthropic-version": "2023-06-01",
-                            "Content-Type": "application/json",
-                        },
-                        json={
-                            "model": attempt_model,
-                            "system": system,
-                            "messages": [{"role": "user", "content": user}],
-                            "temperature": temperature,
-                            "max_tokens": max_tokens,
-                        },
-                    )
-                    if resp.status_code in _OVERLOAD_STATUS_CODES and attempt < _MAX_RETRIES:
-                        print(f"LLM overloaded ({attempt_model}, attempt {attempt + 1}): {resp.status_code} — retrying")
-                        await asyncio.sleep(_RETRY_DELAY_SECONDS)
-                        continue
-                    resp.raise_for_status()
-                    return resp.json()["content"][0]["text"].strip()
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code in _OVERLOAD_STATUS_CODES and attempt < _MAX_RETRIES:
-                    print(f"LLM overloaded ({attempt_model}, attempt {attempt + 1}): {e.response.status_code} — retrying")
-                    await asyncio.sleep(_RETRY_DELAY_SECONDS)
-                    continue
-                print(f"LLM call failed ({attempt_model}): {e}")
-                break  # Non-retryable HTTP error — try fallback model
-            except Exception as e:
-                print(f"LLM call failed ({attempt_model}): {e}")
-                break  # Non-retryable error — try fallback model
+        try:
+            resp = await _post_with_retry(
+                "https://api.anthropic.com/v1/messages",
+                {
+                    "x-api-key": api_key,
+                    "anthropic-version": "2023-06-01",
+                    "Content-Type": "application/json",
+                },
+                {
+                    "model": attempt_model,
+                    "system": [
+                        {"type": "text", "text": system, "cache_control": {"type": "ephemeral"}},
+                    ],
+                    "messages": [{"role": "user", "content": user}],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                },
+                timeout,
+                _ANTHROPIC_SEMA,
+                _ANTHROPIC_TPM,
+                estimated_tokens,
+            )
+            resp.raise_for_status()
+            body = resp.json()
+            if logger.isEnabledFor(logging.DEBUG):
+                usage = body.get("usage") or {}
+                logger.debug(
+                    "Anthropic usage (%s): input=%s cache_read=%s cache_write=%s",
+                    attempt_model,
+                    usage.get("input_tokens"),
+                    usage.get("cache_read_input_tokens"),
+                    usage.get("cache_creation_input_tokens"),
+                )
+            return body["content"][0]["text"].strip()
+        except Exception as e:
+            _warn_sampled(_error_class(e), "LLM call failed (%s): %s", attempt_model, str(e)[:200])
+            # Retries exhausted or non-retryable error — try fallback model
 
     return None
 
@@ -127,31 +297,46 @@ async def _call_llm(
 ) -> Optional[str]:
     """
     Call OpenAI or Anthropic API. Returns response text or None on failure.
-    """
-    import httpx
 
+    Each provider is capped by a concurrency semaphore and a TPM token bucket
+    (OPENAI_/ANTHROPIC_/GROQ_MAX_CONCURRENCY, *_TPM_LIMIT env vars). Transient
+    errors are retried with backoff; failure is only logged once retries are
+    exhausted.
+    """
     try:
         if model.startswith("gpt-") or model.startswith("o1"):
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 return None
 
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                    json={
-                        "model": model,
-                        "messages": [
-                            {"role": "system", "content": system},
-                            {"role": "user", "content": user},
-                        ],
-                        "temperature": temperature,
-                        "max_tokens": max_tokens,
-                    },
+            resp = await _post_with_retry(
+                "https://api.openai.com/v1/chat/completions",
+                {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+                {
+                    "model": model,
+                    "messages": [
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": user},
+                    ],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                },
+                timeout,
+                _OPENAI_SEMA,
+                _OPENAI_TPM,
+                _estimate_tokens(system, user, max_tokens),
+            )
+            resp.raise_for_status()
+            body = resp.json()
+            if logger.isEnabledFor(logging.DEBUG):
+                usage = body.get("usage") or {}
+                logger.debug(
+                    "OpenAI usage (%s): prompt=%s cached=%s",
+                    model,
+                    usage.get("prompt_tokens"),
+                    (usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
                 )
-                resp.raise_for_status()
-                return resp.json()["choices"][0]["message"]["content"].strip()
+            return body["choices"][0]["message"]["content"].strip()
 
         elif model.startswith("claude-"):
             return await _call_anthropic(model, system, user, temperature, max_tokens, timeout)
@@ -161,27 +346,30 @@ async def _call_llm(
             api_key = os.getenv("GROQ_API_KEY")
             if not api_key:
                 return None
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                resp = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-                    json={
-                        "model": groq_model,
-                        "messages": [
-                            {"role": "system", "content": system},
-                            {"role": "user", "content": user},
-                        ],
-                        "temperature": temperature,
-                        "max_tokens": max_tokens,
-                    },
-                )
-                resp.raise_for_status()
-                return resp.json()["choices"][0]["message"]["content"].strip()
+            resp = await _post_with_retry(
+                "https://api.groq.com/openai/v1/chat/completions",
+                {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+                {
+                    "model": groq_model,
+                    "messages": [
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": user},
+                    ],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                },
+                timeout,
+                _GROQ_SEMA,
+                _GROQ_TPM,
+                _estimate_tokens(system, user, max_tokens),
+            )
+            resp.raise_for_status()
+            return resp.json()["choices"][0]["message"]["content"].strip()
 
         return None  # Unknown model
 
     except Exception as e:
-        print(f"LLM call failed ({model}): {e}")
+        _warn_sampled(_error_class(e), "LLM call failed (%s): %s", model, str(e)[:200])
         return None
 
 
@@ -211,7 +399,7 @@ async def rewrite_outbound_text_llm(
     }
 
     if not model or model == "stub" or not llm_settings.get("enabled", False):
-        print(f"WARN rewrite_outbound_text_llm: LLM disabled or no model — skipping rewrite")
+        logger.warning("rewrite_outbound_text_llm: LLM disabled or no model — skipping rewrite")
         return result
 
     try:
@@ -745,12 +933,40 @@ async def compose_reengage_message(
     return result
 
 
+def format_history_line(role: str, text: str) -> str:
+    """One transcript line as shown to the LLM ("Lead: ..." / "You: ...")."""
+    return f"{'Lead' if role == 'user' else 'You'}: {text}"
+
+
+def llm_enabled(llm_settings: dict) -> bool:
+    """True when the tenant's LLM settings allow a real model call."""
+    model = llm_settings.get("model", "")
+    return bool(model) and model != "stub" and bool(llm_settings.get("enabled", False))
+
+
+# process_inbound_message result when the tenant's LLM is off. Read-only so callers
+# that skip the call entirely can share it.
+LLM_DISABLED_RESULT: Mapping[str, Any] = MappingProxyType({
+    "intent": "unclear",
+    "slot_index": None,
+    "should_book": False,
+    "should_handoff": False,
+    "preferred_day": None,
+    "preferred_time": None,
+    "explicit_time": None,
+    "reply_text": "",
+    "used": False,
+    "error": "llm_disabled",
+})
+
+
 async def process_inbound_message(
     conversation_history: list[dict],
     offered_slots: list[str],
     display_slots: list[str],
     bot_settings: dict,
     llm_settings: dict,
+    history_prefix: Optional[str] = None,
 ) -> dict:
     """
     Classify intent and compose a reply for an inbound message.
@@ -761,12 +977,20 @@ async def process_inbound_message(
         display_slots: Human-readable versions of offered_slots.
         bot_settings: Bot settings dict from get_bot_settings().
         llm_settings: LLM config dict from get_llm_settings().
+        history_prefix: Pre-formatted history (every message except the latest,
+            one format_history_line() per line). Callers that already walk the
+            history can build it incrementally and skip the re-join here.
 
     Returns:
         {intent, slot_index, should_book, should_handoff, reply_text, used, error}
     """
     import json as _json
 
+    # LLM disabled — bot goes silent for this turn
+    if not llm_enabled(llm_settings):
+        logger.warning("process_inbound_message: LLM disabled — bot silent for this turn")
+        return dict(LLM_DISABLED_RESULT)
+
     model = llm_settings.get("model", "")
     last_message = conversation_history[-1]["text"] if conversation_history else ""
 
@@ -783,12 +1007,6 @@ async def process_inbound_message(
         "error": None,
     }
 
-    # LLM disabled — bot goes silent for this turn
-    if not model or model == "stub" or not llm_settings.get("enabled", False):
-        print("WARN process_inbound_message: LLM disabled — bot silent for this turn")
-        result["error"] = "llm_disabled"
-        return result
-
     # Extract bot settings for prompt
     assistant_name = bot_settings.get("assistant_name") or "the assistant"
     business_name = bot_settings.get("business_name") or ""
@@ -844,10 +1062,13 @@ async def process_inbound_message(
     else:
         slots_section = "\nNo slots have been offered yet.\n"
 
-    history_lines = "\n".join(
-        f"{'Lead' if m['role'] == 'user' else 'You'}: {m['text']}"
-        for m in conversation_history[:-1]  # exclude latest message — shown separately
-    )
+    if history_prefix is not None:
+        history_lines = history_prefix
+    else:
+        history_lines = "\n".join(
+            format_history_line(m["role"], m["text"])
+            for m in conversation_history[:-1]  # exclude latest message — shown separately
+        )
     if not history_lines:
         history_lines = "(no prior messages)"
 
@@ -912,6 +1133,40 @@ async def process_inbound_message(
     return result
 
 
+# Confirmation verdicts keyed by normalised text (deterministic at temperature=0).
+# Primed with the common short replies so they never reach the LLM.
+_CONFIRM_CACHE_MAX = 4096
+_CONFIRM_CACHE_KEY_LEN = 128
+_CONFIRM_CACHE: OrderedDict[str, bool] = OrderedDict(
+    [(t, True) for t in (
+        "yes", "yeah", "yep", "yup", "yes please", "confirmed", "confirm",
+        "sounds good", "perfect", "great", "ok", "okay", "sure", "book it",
+    )]
+    + [(t, False) for t in (
+        "no", "nope", "no thanks", "not now", "not sure", "maybe",
+        "1", "2", "3", "the first one", "the second one",
+    )]
+)
+
+
+# ASCII lowercase + punctuation strip in one str.translate pass, so "Yes!",
+# "yes." and "YES" share a cache entry without a regex substitution.
+_CONFIRM_NORMALIZE_TABLE = str.maketrans(
+    string.ascii_uppercase, string.ascii_lowercase, string.punctuation
+)
+
+
+def _confirm_cache_key(text: str) -> str:
+    return text.translate(_CONFIRM_NORMALIZE_TABLE).strip()[:_CONFIRM_CACHE_KEY_LEN]
+
+
+def _confirm_cache_put(key: str, value: bool) -> None:
+    _CONFIRM_CACHE[key] = value
+    _CONFIRM_CACHE.move_to_end(key)
+    if len(_CONFIRM_CACHE) > _CONFIRM_CACHE_MAX:
+        _CONFIRM_CACHE.popitem(last=False)
+
+
 async def classify_confirmation_intent_llm(
     text: str,
     llm_settings: dict[str, Any],
@@ -919,6 +1174,9 @@ async def classify_confirmation_intent_llm(
     """
     Classify if text contains confirmation intent.
 
+    Answers for previously seen (or primed) text come from _CONFIRM_CACHE
+    with used=False; only definitive yes/no verdicts are cached.
+
     Returns: {has_confirmation: bool|None, used: bool, error: str|None}
     """
     model = llm_settings.get("model", "")
@@ -933,6 +1191,13 @@ async def classify_confirmation_intent_llm(
         result["error"] = "llm_disabled"
         return result
 
+    cache_key = _confirm_cache_key(text)
+    cached = _CONFIRM_CACHE.get(cache_key)
+    if cached is not None:
+        _CONFIRM_CACHE.move_to_end(cache_key)
+        result["has_confirmation"] = cached
+        return result
+
     try:
         response = await _call_llm(
             model=model,
@@ -948,8 +1213,10 @@ async def classify_confirmation_intent_llm(
             resp_lower = response.lower()
             if resp_lower.startswith("yes"):
                 result["has_confirmation"] = True
+                _confirm_cache_put(cache_key, True)
             elif resp_lower.startswith("no"):
                 result["has_confirmation"] = False
+                _confirm_cache_put(cache_key, False)
             else:
                 result["error"] = f"unexpected_response:{resp_lower[:20]}"
         else:
@@ -1,13 +1,24 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from zoneinfo import ZoneInfo
-from typing import Any, Dict, Tuple, Optional
+from typing import Any, Callable, Dict, Mapping, Tuple, Optional
+import asyncio
 import asyncpg
-import json
+import heapq
+import httpx
+import logging
+import operator
+import orjson
 import os
+import re
+import string
+import time
+import weakref
 
 from app.config import settings  # ensures dotenv is loaded
+from app.db import prepared, register_prepared
 from app.adapters.calendar import get_calendar_adapter
 from app.adapters.calendar.slots import (
     filter_slots_by_signals,
@@ -15,28 +26,44 @@ from app.adapters.calendar.slots import (
     format_slots_for_display,
     pick_soonest_two_slots,
 )
-from app.bot.routing import route_from_text, route_info_to_dict
+from app.bot.routing import Signals, route_from_text, route_info_to_dict
 from app.bot.tenants import (
     load_tenant,
+    load_tenant_credentials,
     get_calendar_settings,
     get_booking_config,
     get_llm_settings,
     get_bot_settings,
 )
-from app.bot.llm import process_inbound_message, compose_reengage_message, compose_first_touch_message
+from app.bot.llm import (
+    process_inbound_message,
+    compose_reengage_message,
+    compose_first_touch_message,
+    format_history_line,
+    llm_enabled,
+    LLM_DISABLED_RESULT,
+)
 from app.bot.jobs import find_and_claim_siblings, mark_siblings_done
 from app.bot.trace_logger import log_processing_run, build_debug_snapshot
-from app.engine.events import resolve_or_create_lead, write_lead_event
+from app.engine.events import write_contact_event
 
 # Offer expiry: 2 hours
 OFFER_EXPIRY_HOURS = 2
 
+# Timezone lookups, memoised (tenants share a handful of zones)
+logger = logging.getLogger(__name__)
+
+_TZ = lru_cache(maxsize=32)(ZoneInfo)
+_UTC = _TZ("UTC")
+_LONDON = _TZ("Europe/London")  # default bot timezone for per-job timestamps
+
 
 class _NullSignals:
     """Null signals for first-touch slot fetching (no day/time preference yet)."""
     day = None
     time_window = None
     explicit_time = None
+    explicit_date = None
 
 
 class _NullRouteInfo:
@@ -45,6 +72,59 @@ class _NullRouteInfo:
     signals = _NullSignals()
 
 
+_SIGNAL_FIELDS = operator.attrgetter("day", "time_window", "explicit_time", "explicit_date")
+
+
+@dataclass(slots=True, frozen=True)
+class _OfferRouteInfo:
+    """route_info for offers driven by LLM-extracted preferences rather than the pattern router."""
+    signals: Signals
+    route: str = "offer_slots"
+
+
+_FIRST_TOUCH_FIELDS = ("name_part", "slot_1", "slot_2")
+
+# Fallback greeting with no slots and no name (common for bare SMS leads), rendered once
+_FIRST_TOUCH_NO_SLOTS_NO_NAME = (
+    "Hi, we'd love to set up a quick call. "
+    "What day and time works best for you?"
+)
+
+
+@lru_cache(maxsize=256)
+def _compile_first_touch_template(template: str) -> Callable[[str, str, str], str]:
+    """
+    Parse a tenant first_touch_template once into a render(name_part, slot_1, slot_2) closure.
+
+    Templates using only plain {name_part}/{slot_1}/{slot_2} fields are rendered by joining
+    pre-split pieces; anything else (format specs, conversions, unknown fields) keeps
+    str.format so errors surface exactly as before. Keyed by template text, so each
+    tenant's template is parsed once per process.
+    """
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError:
+        parsed = None
+
+    if parsed is None or any(
+        field is not None and (field not in _FIRST_TOUCH_FIELDS or spec or conv)
+        for _, field, spec, conv in parsed
+    ):
+        def render(name_part: str, slot_1: str, slot_2: str) -> str:
+            return template.format(name_part=name_part, slot_1=slot_1, slot_2=slot_2)
+        return render
+
+    pieces = tuple((literal, field) for literal, field, _, _ in parsed)
+
+    def render(name_part: str, slot_1: str, slot_2: str) -> str:
+        values = {"name_part": name_part, "slot_1": slot_1, "slot_2": slot_2}
+        return "".join(
+            literal + values[field] if field is not None else literal
+            for literal, field in pieces
+        )
+    return render
+
+
 def _build_first_touch_text(
     display_slots: list,
     name_part: str,
@@ -58,7 +138,7 @@ def _build_first_touch_text(
         slot_1 = display_slots[0] if len(display_slots) > 0 else ""
         slot_2 = display_slots[1] if len(display_slots) > 1 else ""
         try:
-            return template.format(name_part=name_part, slot_1=slot_1, slot_2=slot_2)
+            return _compile_first_touch_template(template)(name_part, slot_1, slot_2)
         except (KeyError, IndexError):
             pass  # Fall through to default
 
@@ -73,6 +153,8 @@ def _build_first_touch_text(
             f"Hi{name_part}, I've got {display_slots[0]} free for a quick call. "
             f"Does that work for you?"
         )
+    elif not name_part:
+        return _FIRST_TOUCH_NO_SLOTS_NO_NAME
     else:
         return (
             f"Hi{name_part}, we'd love to set up a quick call. "
@@ -81,43 +163,35 @@ def _build_first_touch_text(
 
 
 def _coerce_payload(payload_raw) -> dict:
-    if payload_raw is None:
-        return {}
-    if isinstance(payload_raw, dict):
+    # jsonb comes back as a dict through the pool's codec, so that case goes
+    # first; exact type checks keep the dispatch cheap on the per-job path.
+    t = type(payload_raw)
+    if t is dict:
         return payload_raw
-    if isinstance(payload_raw, list):
-        # Unwrap single-element list containing a dict
-        if payload_raw and isinstance(payload_raw[-1], dict):
-            return payload_raw[-1]
-        print(f"DEBUG _coerce_payload: unexpected list without dict, returning {{}}")
+    if payload_raw is None:
         return {}
-    if isinstance(payload_raw, str):
+    if t is str:
         s = payload_raw.strip()
         if not s:
             return {}
         try:
-            parsed = json.loads(s)
-            # json.loads might return a list; unwrap if needed
-            if isinstance(parsed, list):
-                if parsed and isinstance(parsed[-1], dict):
-                    return parsed[-1]
-                print(f"DEBUG _coerce_payload: parsed list without dict, returning {{}}")
-                return {}
-            if isinstance(parsed, dict):
-                return parsed
-            print(f"DEBUG _coerce_payload: parsed non-dict type {type(parsed).__name__}, returning {{}}")
-            return {}
-        except json.JSONDecodeError:
-            print(f"DEBUG _coerce_payload: JSONDecodeError, returning {{}}")
+            payload_raw = orjson.loads(s)
+        except orjson.JSONDecodeError:
+            logger.debug("_coerce_payload: JSONDecodeError, returning {}")
             return {}
-    # asyncpg sometimes returns Record-like mappings; try dict()
-    try:
-        return dict(payload_raw)
-    except Exception:
-        print(f"DEBUG _coerce_payload: unexpected type {type(payload_raw).__name__}, returning {{}}")
+        t = type(payload_raw)
+        if t is dict:
+            return payload_raw
+    if t is list:
+        # Unwrap a list whose last element is the dict
+        if payload_raw and type(payload_raw[-1]) is dict:
+            return payload_raw[-1]
+        logger.debug("_coerce_payload: list without dict, returning {}")
         return {}
+    logger.warning("_coerce_payload: unexpected type %s, returning {}", t.__name__)
+    return {}
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class InboundEvent:
     inbound_event_id: str
     tenant_id: str
@@ -150,51 +224,118 @@ JOIN bot.inbound_events ie ON ie.inbound_event_id = jq.inbound_event_id
 WHERE jq.job_id = $1::uuid;
 """
 
-UPSERT_CONTACT_SQL = """
-INSERT INTO bot.contacts (
-  tenant_id, channel, channel_address, display_name, metadata, created_at, updated_at
-)
-VALUES (
-  $1::uuid, $2::text, $3::text, $4::text, COALESCE($5::jsonb, '{}'::jsonb), now(), now()
-)
-ON CONFLICT (tenant_id, channel, channel_address)
-DO UPDATE SET
-  display_name = COALESCE(EXCLUDED.display_name, bot.contacts.display_name),
-  metadata = bot.contacts.metadata || EXCLUDED.metadata,
-  updated_at = now()
-RETURNING contact_id::text;
-"""
+# Contact upsert shared by both job entry points below: $1 tenant_id, $2 channel,
+# $3 channel_address, $4 display_name, $5 contact metadata.
 
-# one OPEN per contact enforced by UNIQUE(tenant_id, contact_id, status)
-UPSERT_OPEN_CONVERSATION_SQL = """
-INSERT INTO bot.conversations (
-  tenant_id, contact_id, status, last_step, last_intent, context,
-  last_inbound_at, created_at, updated_at
-)
-VALUES (
-  $1::uuid, $2::uuid, 'open', 'start', NULL, '{}'::jsonb,
-  now(), now(), now()
+# new_lead entry point in one round trip: upsert the contact, then upsert its open
+# conversation (one OPEN per contact enforced by UNIQUE(tenant_id, contact_id, status))
+# and return the conversation's context.
+UPSERT_CONTACT_AND_OPEN_CONVERSATION_SQL = """
+WITH c AS (
+  INSERT INTO bot.contacts (
+    tenant_id, channel, channel_address, display_name, metadata, created_at, updated_at
+  )
+  VALUES (
+    $1::uuid, $2::text, $3::text, $4::text, COALESCE($5::jsonb, '{}'::jsonb), now(), now()
+  )
+  ON CONFLICT (tenant_id, channel, channel_address)
+  DO UPDATE SET
+    display_name = COALESCE(EXCLUDED.display_name, bot.contacts.display_name),
+    metadata = bot.contacts.metadata || EXCLUDED.metadata,
+    updated_at = now()
+  RETURNING contact_id
+),
+conv AS (
+  INSERT INTO bot.conversations (
+    tenant_id, contact_id, status, last_step, last_intent, context,
+    last_inbound_at, created_at, updated_at
+  )
+  SELECT
+    $1::uuid, c.contact_id, 'open', 'start', NULL, '{}'::jsonb,
+    now(), now(), now()
+  FROM c
+  ON CONFLICT (tenant_id, contact_id, status)
+  DO UPDATE SET
+    last_inbound_at = now(),
+    updated_at = now()
+  RETURNING conversation_id, context
 )
-ON CONFLICT (tenant_id, contact_id, status)
-DO UPDATE SET
-  last_inbound_at = now(),
-  updated_at = now()
-RETURNING conversation_id::text;
-"""
-
-FIND_OPEN_CONVERSATION_SQL = """
-SELECT conversation_id::text
-FROM bot.conversations
-WHERE tenant_id = $1::uuid
-  AND contact_id = $2::uuid
-  AND status = 'open'
-LIMIT 1;
+SELECT
+  c.contact_id::text AS contact_id,
+  conv.conversation_id::text AS conversation_id,
+  conv.context
+FROM c, conv;
 """
 
-CLOSE_CONVERSATION_SQL = """
-UPDATE bot.conversations
-SET status = 'closed', updated_at = now()
-WHERE conversation_id = $1::uuid;
+# inbound_message entry point in one round trip: upsert the contact, find its open
+# conversation and, only if there is one, insert the inbound message idempotently
+# (same rules as INSERT_INBOUND_MESSAGE_IDEMPOTENT_SQL). Always returns one row;
+# conversation_id is NULL when no conversation is open (nothing is inserted then).
+# $6 text, $7 provider, $8 provider_msg_id, $9 dedupe_key, $10 payload,
+# $11 inbound_event_id, $12 event_type, $13 trace_id
+UPSERT_CONTACT_AND_INSERT_INBOUND_SQL = """
+WITH c AS (
+  INSERT INTO bot.contacts (
+    tenant_id, channel, channel_address, display_name, metadata, created_at, updated_at
+  )
+  VALUES (
+    $1::uuid, $2::text, $3::text, $4::text, COALESCE($5::jsonb, '{}'::jsonb), now(), now()
+  )
+  ON CONFLICT (tenant_id, channel, channel_address)
+  DO UPDATE SET
+    display_name = COALESCE(EXCLUDED.display_name, bot.contacts.display_name),
+    metadata = bot.contacts.metadata || EXCLUDED.metadata,
+    updated_at = now()
+  RETURNING contact_id
+),
+conv AS (
+  SELECT conversation_id, context
+  FROM bot.conversations
+  WHERE tenant_id = $1::uuid
+    AND contact_id = (SELECT contact_id FROM c)
+    AND status = 'open'
+  LIMIT 1
+),
+existing AS (
+  SELECT m.message_id::text AS message_id
+  FROM bot.messages m
+  WHERE m.tenant_id = $1::uuid
+    AND m.direction = 'inbound'
+    AND (
+      ($8::text IS NOT NULL AND m.provider = $7::text AND m.provider_msg_id = $8::text)
+      OR
+      ($8::text IS NULL AND (m.payload->>'dedupe_key') = $9::text)
+    )
+  LIMIT 1
+),
+ins AS (
+  INSERT INTO bot.messages (
+    tenant_id, conversation_id, contact_id,
+    direction, provider, provider_msg_id, channel, text, payload, created_at, trace_id
+  )
+  SELECT
+    $1::uuid, conv.conversation_id, c.contact_id,
+    'inbound', $7::text, $8::text, $2::text, $6::text,
+    COALESCE($10::jsonb, '{}'::jsonb) || jsonb_build_object(
+      'inbound_event_id', $11::text,
+      'dedupe_key', $9::text,
+      'event_type', $12::text
+    ),
+    now(),
+    $13::uuid
+  FROM conv, c
+  WHERE NOT EXISTS (SELECT 1 FROM existing)
+  RETURNING message_id::text AS message_id
+)
+SELECT
+  c.contact_id::text AS contact_id,
+  conv.conversation_id::text AS conversation_id,
+  conv.context,
+  CASE WHEN conv.conversation_id IS NOT NULL THEN
+    COALESCE((SELECT message_id FROM ins), (SELECT message_id FROM existing))
+  END AS message_id
+FROM c
+LEFT JOIN conv ON TRUE;
 """
 
 # Idempotent insert using either provider_msg_id (best) or dedupe_key (fallback).
@@ -234,12 +375,6 @@ ins AS (
 SELECT COALESCE((SELECT message_id FROM ins), (SELECT message_id FROM existing)) AS message_id;
 """
 
-UPDATE_CONVERSATION_LAST_INBOUND_SQL = """
-UPDATE bot.conversations
-SET last_inbound_at = now(), updated_at = now()
-WHERE conversation_id = $1::uuid;
-"""
-
 INSERT_OUTBOUND_MESSAGE_SQL = """
 INSERT INTO bot.messages (
   tenant_id, conversation_id, contact_id,
@@ -252,14 +387,75 @@ VALUES (
 RETURNING message_id::text;
 """
 
+# Context merge plus optional close ($3) in one UPDATE (re-engage bumps)
 UPDATE_CONVERSATION_CONTEXT_SQL = """
 UPDATE bot.conversations
-SET context = context || $2::jsonb, updated_at = now()
+SET context = context || $2::jsonb,
+    status = CASE WHEN $3::boolean THEN 'closed' ELSE status END,
+    updated_at = now()
 WHERE conversation_id = $1::uuid;
 """
 
-LOAD_CONVERSATION_CONTEXT_SQL = """
-SELECT context FROM bot.conversations WHERE conversation_id = $1::uuid;
+# End-of-turn conversation write for inbound messages: last_inbound_at, the merged
+# context (route updates + debug snapshot) and the terminal close ($3) in one UPDATE.
+# Runs inside the job transaction, so now() matches the start of the turn.
+FINALIZE_INBOUND_CONVERSATION_SQL = """
+UPDATE bot.conversations
+SET context = context || $2::jsonb,
+    status = CASE WHEN $3::boolean THEN 'closed' ELSE status END,
+    last_inbound_at = now(),
+    updated_at = now()
+WHERE conversation_id = $1::uuid;
+"""
+
+# Pending outbound insert + FINALIZE_INBOUND_CONVERSATION_SQL in one round trip
+# ($1-$8 as INSERT_OUTBOUND_MESSAGE_SQL, $9 context merge, $10 close).
+INSERT_OUTBOUND_AND_FINALIZE_INBOUND_SQL = """
+WITH ins AS (
+  INSERT INTO bot.messages (
+    tenant_id, conversation_id, contact_id,
+    direction, provider, channel, text, payload, created_at, trace_id
+  )
+  VALUES (
+    $1::uuid, $2::uuid, $3::uuid,
+    'outbound', $4::text, $5::text, $6::text, $7::jsonb, now(), $8::uuid
+  )
+  RETURNING message_id::text AS message_id
+),
+upd AS (
+  UPDATE bot.conversations
+  SET context = context || $9::jsonb,
+      status = CASE WHEN $10::boolean THEN 'closed' ELSE status END,
+      last_inbound_at = now(),
+      updated_at = now()
+  WHERE conversation_id = $2::uuid
+)
+SELECT message_id FROM ins;
+"""
+
+# Outbound insert + context merge in one round trip. The new message_id is
+# written into context.lead_touchpoint.message_id ($9 must contain lead_touchpoint).
+INSERT_OUTBOUND_AND_UPDATE_CONTEXT_SQL = """
+WITH ins AS (
+  INSERT INTO bot.messages (
+    tenant_id, conversation_id, contact_id,
+    direction, provider, channel, text, payload, created_at, trace_id
+  )
+  VALUES (
+    $1::uuid, $2::uuid, $3::uuid,
+    'outbound', $4::text, $5::text, $6::text, $7::jsonb, now(), $8::uuid
+  )
+  RETURNING message_id::text AS message_id
+),
+upd AS (
+  UPDATE bot.conversations
+  SET context = context || jsonb_set(
+        $9::jsonb, '{lead_touchpoint,message_id}', to_jsonb((SELECT message_id FROM ins))
+      ),
+      updated_at = now()
+  WHERE conversation_id = $2::uuid
+)
+SELECT message_id FROM ins;
 """
 
 LOAD_RECENT_MESSAGES_SQL = """
@@ -271,6 +467,20 @@ LIMIT 20;
 """
 
 
+register_prepared(
+    LOAD_JOB_EVENT_SQL,
+    INSERT_INBOUND_MESSAGE_IDEMPOTENT_SQL,
+    UPSERT_CONTACT_AND_OPEN_CONVERSATION_SQL,
+    UPSERT_CONTACT_AND_INSERT_INBOUND_SQL,
+    INSERT_OUTBOUND_MESSAGE_SQL,
+    INSERT_OUTBOUND_AND_UPDATE_CONTEXT_SQL,
+    UPDATE_CONVERSATION_CONTEXT_SQL,
+    FINALIZE_INBOUND_CONVERSATION_SQL,
+    INSERT_OUTBOUND_AND_FINALIZE_INBOUND_SQL,
+    LOAD_RECENT_MESSAGES_SQL,
+)
+
+
 def _extract_text(payload: dict[str, Any]) -> str:
     """
     Best-effort extraction. Adjust to your actual webhook schema.
@@ -305,16 +515,13 @@ async def _handle_new_lead(
     conv_context: dict[str, Any],
     display_name: Optional[str],
     tenant: dict[str, Any],
+    now: datetime,
 ) -> dict[str, Any]:
     """
     Handle new_lead event: fetch 2 slots immediately, send first-touch message.
     Idempotent: if lead_touchpoint already exists, do nothing.
     """
-    from zoneinfo import ZoneInfo
-
     bot_settings = get_bot_settings(tenant)
-    tz = ZoneInfo("Europe/London")
-    now = datetime.now(tz)
 
     # Idempotency: if lead_touchpoint already exists, skip
     existing_touchpoint = conv_context.get("lead_touchpoint")
@@ -334,10 +541,9 @@ async def _handle_new_lead(
         }
 
     # Fetch 2 slots for first-touch (no signals — just pick soonest two)
-    _, first_touch_offer = await _handle_offer_slots(conn, ev.tenant_id, _NullRouteInfo())
+    _, first_touch_offer = await _handle_offer_slots(conn, ev.tenant_id, _NullRouteInfo(), now=now)
     offered_slots = first_touch_offer.get("offered_slots", [])
-    offer_tz = first_touch_offer.get("timezone", "Europe/London")
-    display_slots = format_slots_for_display(offered_slots, timezone=offer_tz) if offered_slots else []
+    display_slots = first_touch_offer.get("display_slots", [])
 
     # Build first-touch message (use first name only)
     first_name = display_name.split()[0] if display_name else ""
@@ -385,18 +591,6 @@ async def _handle_new_lead(
         "llm": llm_first_touch,
     }
 
-    out_message_id = await conn.fetchval(
-        INSERT_OUTBOUND_MESSAGE_SQL,
-        ev.tenant_id,
-        conversation_id,
-        contact_id,
-        ev.provider,
-        ev.channel,
-        out_text,
-        out_payload_dict,
-        ev.trace_id,
-    )
-
     # Glass-box: debug snapshot for new_lead
     debug_snapshot = build_debug_snapshot(
         route="new_lead",
@@ -409,11 +603,12 @@ async def _handle_new_lead(
         transition={"from": "start", "to": "new_lead"},
     )
 
-    # Set lead_touchpoint, last_offer, and debug snapshot in context
+    # Set lead_touchpoint, last_offer, and debug snapshot in context —
+    # inserted together with the outbound message (SQL fills in message_id)
     lead_touchpoint = {
         "first_touch_at": now.isoformat(),
         "channel": ev.channel,
-        "message_id": out_message_id,
+        "message_id": None,
     }
     context_updates = {
         "lead_touchpoint": lead_touchpoint,
@@ -421,7 +616,17 @@ async def _handle_new_lead(
         "debug": {"last_run": debug_snapshot},
         "_last_step": "new_lead",
     }
-    await conn.execute(UPDATE_CONVERSATION_CONTEXT_SQL, conversation_id, context_updates)
+    out_message_id = await (await prepared(conn, INSERT_OUTBOUND_AND_UPDATE_CONTEXT_SQL)).fetchval(
+        ev.tenant_id,
+        conversation_id,
+        contact_id,
+        ev.provider,
+        ev.channel,
+        out_text,
+        out_payload_dict,
+        ev.trace_id,
+        context_updates,
+    )
 
     # Glass-box: structured logging for new_lead
     log_processing_run(
@@ -457,67 +662,133 @@ def _ordinal(n: int) -> str:
     return f"{n}{['th', 'st', 'nd', 'rd', 'th'][min(n % 10, 4)]}"
 
 
+# "4:35", "9am", "16:00", "2:30 pm" (a trailing ":ss" is tolerated and ignored)
+_TIME_RE = re.compile(r"^\s*(\d+)\s*(?::\s*(\d+)\s*)?(?::\s*\d+\s*)?(am|pm)?\s*$", re.IGNORECASE)
+
+
 def _parse_explicit_time_to_hour(explicit_time: str) -> Optional[float]:
     """Parse a time string like '4:35', '9am', '16:00' to a float hour (e.g. 16.583).
     Times < 8 with no am/pm marker are assumed pm (business context)."""
+    m = _TIME_RE.match(str(explicit_time))
+    if not m:
+        return None
+    h = int(m[1])
+    minutes = int(m[2] or 0)
+    suffix = (m[3] or "").lower()
+    if suffix == "pm" and h != 12:
+        h += 12
+    elif not suffix and h < 8:
+        h += 12  # "4:35" without am/pm in business context → 16:35
+    return h + minutes / 60
+
+
+@lru_cache(maxsize=4096)
+def _parse_slot_iso(slot_iso: str) -> Optional[datetime]:
+    """Parse a slot ISO string to an aware datetime (naive → UTC); None if invalid."""
     try:
-        raw = str(explicit_time).lower().strip()
-        is_pm = "pm" in raw
-        is_am = "am" in raw
-        t = raw.replace("am", "").replace("pm", "").strip()
-        parts = t.split(":")
-        h = int(parts[0])
-        m = int(parts[1]) if len(parts) > 1 else 0
-        if is_pm and h != 12:
-            h += 12
-        elif not is_am and not is_pm and h < 8:
-            h += 12  # "4:35" without am/pm in business context → 16:35
-        return h + m / 60
-    except (ValueError, IndexError):
+        if slot_iso.endswith("Z"):
+            slot_dt = datetime.fromisoformat(slot_iso[:-1] + "+00:00")
+        else:
+            slot_dt = datetime.fromisoformat(slot_iso)
+    except ValueError:
         return None
+    if slot_dt.tzinfo is None:
+        slot_dt = slot_dt.replace(tzinfo=_UTC)
+    return slot_dt
 
 
-def _find_nearest_slot(
+def _parse_slots(slots: list[str]) -> list[tuple[str, datetime]]:
+    """(iso, datetime) for every parseable slot, in input order (parses are cached)."""
+    parsed = []
+    for slot_iso in slots:
+        slot_dt = _parse_slot_iso(slot_iso)
+        if slot_dt is not None:
+            parsed.append((slot_iso, slot_dt))
+    return parsed
+
+
+_WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+_DAY_MAP: dict[str, int] = {name: wd for wd, name in enumerate(_WEEKDAY_NAMES)}
+
+
+def _slots_soa(slots: list[str], timezone: str) -> Dict[str, list]:
+    """
+    Column-wise local-time fields for offered slots, stored in last_offer so
+    later checks compare ints instead of re-parsing ISO strings.
+
+    weekday is Monday=0, day is day-of-month, minute is minutes since local midnight.
+    """
+    tz = _TZ(timezone)
+    soa: Dict[str, list] = {"iso": [], "epoch": [], "weekday": [], "day": [], "minute": []}
+    for slot_iso, slot_dt in _parse_slots(slots):
+        local_dt = slot_dt.astimezone(tz)
+        soa["iso"].append(slot_iso)
+        soa["epoch"].append(int(slot_dt.timestamp()))
+        soa["weekday"].append(local_dt.weekday())
+        soa["day"].append(local_dt.day)
+        soa["minute"].append(local_dt.hour * 60 + local_dt.minute)
+    return soa
+
+
+def _rank_slots_by_hour(
     slots: list[str],
     preferred_day: Optional[str],
     target_hour: float,
     timezone: str,
-    tolerance_minutes: int = 45,
-) -> Optional[str]:
-    """Find the slot closest to target_hour on preferred_day within tolerance."""
-    from zoneinfo import ZoneInfo
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
-    day_map = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-               "friday": 4, "saturday": 5, "sunday": 6}
+    limit: Optional[int] = None,
+) -> list[tuple[float, datetime, str]]:
+    """
+    Score every slot on preferred_day by distance from target_hour in one pass.
 
-    best_slot: Optional[str] = None
-    best_diff = float("inf")
+    Returns (hour_diff, slot_dt, slot_iso) tuples, nearest first (stable, so
+    ties keep calendar order). The nearest-slot lookups only need the top one
+    or two, so they pass limit to select those without sorting every slot.
+    """
+    tz = _TZ(timezone)
+    target_wd = _DAY_MAP.get(preferred_day.lower()) if preferred_day else None
 
-    for slot_iso in slots:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            local_dt = slot_dt.astimezone(tz)
-        except ValueError:
+    candidates: list[tuple[float, datetime, str]] = []
+    for slot_iso, slot_dt in _parse_slots(slots):
+        local_dt = slot_dt.astimezone(tz)
+        if target_wd is not None and local_dt.weekday() != target_wd:
             continue
+        slot_hour = local_dt.hour + local_dt.minute / 60
+        candidates.append((abs(slot_hour - target_hour), slot_dt, slot_iso))
 
-        if preferred_day and preferred_day.lower() in day_map:
-            if local_dt.weekday() != day_map[preferred_day.lower()]:
-                continue
+    if limit is not None:
+        # nsmallest is stable like sorted(), so ties still keep calendar order
+        return heapq.nsmallest(limit, candidates, key=lambda x: x[0])
+    candidates.sort(key=lambda x: x[0])
+    return candidates
 
-        slot_hour = local_dt.hour + local_dt.minute / 60
-        diff = abs(slot_hour - target_hour)
-        if diff < best_diff:
-            best_diff = diff
-            best_slot = slot_iso
 
-    if best_slot and best_diff <= tolerance_minutes / 60:
-        return best_slot
+def _nearest_from_ranked(
+    ranked: list[tuple[float, datetime, str]],
+    tolerance_minutes: int = 45,
+) -> Optional[str]:
+    """Closest ranked slot if within tolerance, else None."""
+    if ranked and ranked[0][0] <= tolerance_minutes / 60:
+        return ranked[0][2]
     return None
 
 
+def _two_nearest_from_ranked(ranked: list[tuple[float, datetime, str]]) -> list[str]:
+    """The 2 closest ranked slots, in chronological order."""
+    return [iso for _, _, iso in sorted(ranked[:2], key=lambda x: x[1])]
+
+
+def _find_nearest_slot(
+    slots: list[str],
+    preferred_day: Optional[str],
+    target_hour: float,
+    timezone: str,
+    tolerance_minutes: int = 45,
+) -> Optional[str]:
+    """Find the slot closest to target_hour on preferred_day within tolerance."""
+    ranked = _rank_slots_by_hour(slots, preferred_day, target_hour, timezone, limit=1)
+    return _nearest_from_ranked(ranked, tolerance_minutes)
+
+
 def _find_two_nearest_slots(
     slots: list[str],
     preferred_day: Optional[str],
@@ -525,42 +796,29 @@ def _find_two_nearest_slots(
     timezone: str,
 ) -> list[str]:
     """Find the 2 slots nearest to target_hour (no tolerance limit, best effort)."""
-    from zoneinfo import ZoneInfo
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
-    day_map = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
-               "friday": 4, "saturday": 5, "sunday": 6}
+    return _two_nearest_from_ranked(_rank_slots_by_hour(slots, preferred_day, target_hour, timezone, limit=2))
 
-    candidates: list[tuple[float, datetime, str]] = []
-    for slot_iso in slots:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            local_dt = slot_dt.astimezone(tz)
-        except ValueError:
-            continue
-        if preferred_day and preferred_day.lower() in day_map:
-            if local_dt.weekday() != day_map[preferred_day.lower()]:
-                continue
-        slot_hour = local_dt.hour + local_dt.minute / 60
-        candidates.append((abs(slot_hour - target_hour), slot_dt, slot_iso))
-
-    candidates.sort(key=lambda x: x[0])
-    result = [iso for _, _, iso in candidates[:2]]
-    result.sort(key=lambda iso: datetime.fromisoformat(iso.replace("Z", "+00:00")))
-    return result
 
+def _is_offer_expired(
+    last_offer: dict[str, Any],
+    timezone: str = "Europe/London",
+    now: Optional[datetime] = None,
+) -> bool:
+    """Check if last_offer is expired (older than OFFER_EXPIRY_HOURS).
 
-def _is_offer_expired(offered_at: str, timezone: str = "Europe/London") -> bool:
-    """Check if last_offer is expired (older than OFFER_EXPIRY_HOURS)."""
-    from zoneinfo import ZoneInfo
+    Uses offered_epoch when present; offers stored before it existed fall back
+    to parsing offered_at.
+    """
+    offered_epoch = last_offer.get("offered_epoch")
+    if isinstance(offered_epoch, (int, float)):
+        current = now.timestamp() if now is not None else time.time()
+        return current - offered_epoch > OFFER_EXPIRY_HOURS * 3600
 
-    tz = ZoneInfo(timezone)
-    now = datetime.now(tz)
+    tz = _TZ(timezone)
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
 
     try:
-        offer_dt = datetime.fromisoformat(offered_at)
+        offer_dt = datetime.fromisoformat(last_offer.get("offered_at", ""))
         if offer_dt.tzinfo is None:
             offer_dt = offer_dt.replace(tzinfo=tz)
         return (now - offer_dt) > timedelta(hours=OFFER_EXPIRY_HOURS)
@@ -568,11 +826,15 @@ def _is_offer_expired(offered_at: str, timezone: str = "Europe/London") -> bool:
         return True  # Treat invalid dates as expired
 
 
+@lru_cache(maxsize=4096)
 def _format_slot_for_confirmation(slot_iso: str, timezone: str = "Europe/London") -> str:
-    """Format a slot for confirmation message (e.g., 'Friday 09:15')."""
-    from zoneinfo import ZoneInfo
+    """
+    Format a slot for confirmation message (e.g., 'Friday 09:15').
 
-    tz = ZoneInfo(timezone)
+    Memoised: the same offered slots are formatted for the reply, the debug
+    snapshot and the trace log, and again on the lead's next message.
+    """
+    tz = _TZ(timezone)
     slot_dt = datetime.fromisoformat(slot_iso)
     if slot_dt.tzinfo is None:
         slot_dt = slot_dt.replace(tzinfo=tz)
@@ -585,7 +847,7 @@ def _build_booking_confirmation(slot_iso: str, template: str, timezone: str = "E
     Supported placeholders: {day}, {date}, {month}, {time}
     Example: "Confirmed for {day} {date} {month} at {time}."
     """
-    tz = ZoneInfo(timezone)
+    tz = _TZ(timezone)
     slot_dt = datetime.fromisoformat(slot_iso)
     if slot_dt.tzinfo is None:
         slot_dt = slot_dt.replace(tzinfo=tz)
@@ -626,18 +888,13 @@ async def _emit_booking_event(
         )
         contact_provider = ev.provider
 
-        lead_id = await resolve_or_create_lead(
+        # Lead resolve-or-create and the event insert go in one statement
+        await write_contact_event(
             conn,
             tenant_id=tenant_id,
             contact_provider=contact_provider,
             contact_external_id=contact_external_id,
-            source="inbound_sms",
-        )
-
-        await write_lead_event(
-            conn,
-            lead_id=lead_id,
-            tenant_id=tenant_id,
+            lead_source="inbound_sms",
             event_type="appointment_booked",
             source="bot",
             occurred_at=now,
@@ -652,7 +909,145 @@ async def _emit_booking_event(
         )
     except Exception as exc:
         # Engine write must never break the bot flow
-        print(f"WARN engine event failed: {exc}")
+        logger.warning("engine event failed: %s", exc)
+
+
+async def _load_tenant_or_empty(conn: asyncpg.Connection, tenant_id: str) -> dict[str, Any]:
+    """Load tenant settings (usually a load_tenant cache hit); {} if the load fails."""
+    try:
+        return await load_tenant(conn, tenant_id)
+    except Exception as e:
+        logger.warning("Failed to load tenant %s: %s", tenant_id, e)
+        return {}
+
+
+# Short-lived cache of calendar free-slot lookups:
+# (tenant_id, calendar_id, timezone) -> (expires_at, (slots, trace_id) or a _SlotsFetchFailed).
+# Offers for the same tenant within the TTL share one provider call; failures are
+# cached briefly so retries don't pile onto a calendar API that is already erroring.
+_SLOTS_CACHE_TTL_SECONDS = 30.0
+_SLOTS_ERROR_TTL_SECONDS = 10.0
+_SLOTS_CACHE_MAX = 256
+_slots_cache: dict[tuple[str, str, str], tuple[float, Any]] = {}
+# One lock per key while a fetch is in flight, so concurrent misses wait for it
+_slots_locks: "weakref.WeakValueDictionary[tuple[str, str, str], asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+@dataclass(slots=True, frozen=True)
+class _SlotsFetchFailed:
+    """Cached marker for a failed get_free_slots call."""
+    reason: str   # http_error | auth_error | unknown_error
+    detail: str
+
+
+class _SlotsUnavailableError(Exception):
+    """Free slots couldn't be fetched; raised fresh for every caller of a cached failure."""
+
+    def __init__(self, reason: str, detail: str):
+        super().__init__(detail)
+        self.reason = reason
+
+
+def _slots_error_reason(e: Exception) -> str:
+    # Adapters raise RuntimeError on auth failures (401), httpx errors otherwise
+    if isinstance(e, httpx.HTTPStatusError):
+        return "http_error"
+    if isinstance(e, RuntimeError) and "Unauthorized" in str(e):
+        return "auth_error"
+    return "unknown_error"
+
+
+def _invalidate_slots_cache(tenant_id: str) -> None:
+    """Drop cached free slots for a tenant (a booking just took one of them)."""
+    for key in [k for k in _slots_cache if k[0] == tenant_id]:
+        del _slots_cache[key]
+
+
+async def _get_free_slots_cached(
+    cal_adapter: Any,
+    tenant_id: str,
+    calendar_id: Optional[str],
+    *,
+    start_dt: datetime,
+    end_dt: datetime,
+    timezone: str,
+) -> tuple[list[str], str | None]:
+    """
+    cal_adapter.get_free_slots behind _slots_cache.
+
+    Callers always ask for now..now+14d, so a hit is at most TTL seconds stale.
+    The returned list is shared between callers and must not be mutated.
+    Failures raise _SlotsUnavailableError (a new instance per caller).
+    """
+    key = (tenant_id, calendar_id or "", timezone)
+    cached = _slots_cache.get(key)
+    if cached is None or cached[0] <= time.monotonic():
+        lock = _slots_locks.get(key)
+        if lock is None:
+            lock = _slots_locks[key] = asyncio.Lock()
+        async with lock:
+            cached = _slots_cache.get(key)
+            if cached is None or cached[0] <= time.monotonic():
+                try:
+                    result = await cal_adapter.get_free_slots(
+                        start_dt=start_dt, end_dt=end_dt, timezone=timezone,
+                    )
+                    ttl = _SLOTS_CACHE_TTL_SECONDS
+                except Exception as e:
+                    error = e
+                    result = _SlotsFetchFailed(_slots_error_reason(e), str(e))
+                    ttl = _SLOTS_ERROR_TTL_SECONDS
+                else:
+                    error = None
+                if len(_slots_cache) >= _SLOTS_CACHE_MAX and key not in _slots_cache:
+                    _slots_cache.pop(next(iter(_slots_cache)))
+                _slots_cache[key] = (time.monotonic() + ttl, result)
+                if error is not None:
+                    raise _SlotsUnavailableError(result.reason, result.detail) from error
+                return result
+
+    result = cached[1]
+    if isinstance(result, _SlotsFetchFailed):
+        raise _SlotsUnavailableError(result.reason, result.detail)
+    return result
+
+
+_CALENDAR_UNREACHABLE_TEXT = (
+    "Quick one — I'm having trouble reaching the calendar right now. "
+    "What day works best for you, and would morning, afternoon, or evening be ideal?"
+)
+
+
+def _empty_offer(
+    reason: str,
+    *,
+    calendar_id: Optional[str] = None,
+    checked_range: Optional[Dict[str, str]] = None,
+    constraints: Dict[str, Any],
+    timezone: str,
+    now: datetime,
+) -> Dict[str, Any]:
+    """last_offer for a failed calendar check (no slots offered)."""
+    return {
+        "slots": [],
+        "offered_slots": [],
+        "constraints": constraints,
+        "offered_at": now.isoformat(),
+        "offered_epoch": int(now.timestamp()),
+        "timezone": timezone,
+        "calendar_check": {
+            "ok": False,
+            "trace_id": None,
+            "calendar_id": calendar_id,
+            "checked_range": checked_range,
+            "returned_slots_count": 0,
+            "filtered_slots_count": 0,
+            "reason": reason,
+            "checked_at": now.isoformat(),
+        },
+    }
 
 
 async def _handle_offer_slots(
@@ -660,6 +1055,7 @@ async def _handle_offer_slots(
     tenant_id: str,
     route_info: Any,
     target_hour: Optional[float] = None,
+    now: Optional[datetime] = None,
 ) -> Tuple[str, Dict[str, Any]]:
     """
     Fetch slots (tenant-configured), filter by signals + availability windows,
@@ -667,11 +1063,18 @@ async def _handle_offer_slots(
 
     Observability: calendar_check is stored in last_offer and includes:
     ok, calendar_id, checked_range, returned_slots_count, filtered_slots_count, reason, checked_at
+
+    now is the caller's per-job clock reading; it is converted to the tenant timezone.
     """
-    from zoneinfo import ZoneInfo
+    # Read signals once (Signals or _NullSignals, which carry the same fields)
+    sig_day, sig_window, sig_explicit_time, sig_explicit_date = _SIGNAL_FIELDS(route_info.signals)
+    base_constraints = {"day": sig_day, "time_window": sig_window, "explicit_time": sig_explicit_time}
 
-    # 1) Load tenant + calendar/booking settings from DB
+    # 1) Load tenant + credentials on the job connection. Not a second pool
+    #    connection: waiting on the pool while this transaction holds conn can
+    #    deadlock once every pool connection is held by a job doing the same.
     tenant = await load_tenant(conn, tenant_id)
+    credentials = await load_tenant_credentials(conn, tenant_id)
     cal = get_calendar_settings(tenant)
     booking_cfg = get_booking_config(tenant)
 
@@ -679,112 +1082,45 @@ async def _handle_offer_slots(
     timezone = booking_cfg.get("timezone", "Europe/London")
     availability_windows = booking_cfg.get("availability")  # None if not configured
 
-    tz = ZoneInfo(timezone)
-    now = datetime.now(tz)
+    tz = _TZ(timezone)
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
 
     if not calendar_id:
         out_text = (
             "Quick one — I'm missing calendar setup on our side. "
             "What day works best for you, and would morning, afternoon, or evening be ideal?"
         )
-        last_offer = {
-            "slots": [],
-            "offered_slots": [],
-            "constraints": {
-                "day": getattr(route_info.signals, "day", None),
-                "time_window": getattr(route_info.signals, "time_window", None),
-                "explicit_time": getattr(route_info.signals, "explicit_time", None),
-            },
-            "offered_at": now.isoformat(),
-            "timezone": timezone,
-            "calendar_check": {
-                "ok": False,
-                "trace_id": None,
-                "calendar_id": None,
-                "checked_range": None,
-                "returned_slots_count": 0,
-                "filtered_slots_count": 0,
-                "reason": "missing_calendar_id",
-                "checked_at": now.isoformat(),
-            },
-        }
+        last_offer = _empty_offer(
+            "missing_calendar_id", constraints=base_constraints, timezone=timezone, now=now,
+        )
         return out_text, last_offer
 
     # 2) Compute range
     start_dt = now
     end_dt = now + timedelta(days=14)
+    checked_range = {"start": start_dt.isoformat(), "end": end_dt.isoformat()}
 
-    # 3) Fetch slots via calendar adapter (handles credentials internally)
-    cal_adapter = await get_calendar_adapter(conn, tenant_id)
+    # 3) Fetch slots via calendar adapter (reuses the tenant + credentials loaded above)
+    cal_adapter = await get_calendar_adapter(conn, tenant_id, tenant=tenant, credentials=credentials)
     try:
-        all_slots, trace_id = await cal_adapter.get_free_slots(
+        all_slots, trace_id = await _get_free_slots_cached(
+            cal_adapter,
+            tenant_id,
+            calendar_id,
             start_dt=start_dt,
             end_dt=end_dt,
             timezone=timezone,
         )
-    except RuntimeError as e:
-        # Auth error (401 from GHL)
-        error_msg = str(e)
-        reason = "auth_error" if "Unauthorized" in error_msg else "unknown_error"
-        out_text = (
-            "Quick one — I'm having trouble reaching the calendar right now. "
-            "What day works best for you, and would morning, afternoon, or evening be ideal?"
-        )
-        last_offer = {
-            "slots": [],
-            "offered_slots": [],
-            "constraints": {
-                "day": getattr(route_info.signals, "day", None),
-                "time_window": getattr(route_info.signals, "time_window", None),
-                "explicit_time": getattr(route_info.signals, "explicit_time", None),
-            },
-            "offered_at": now.isoformat(),
-            "timezone": timezone,
-            "calendar_check": {
-                "ok": False,
-                "trace_id": None,
-                "calendar_id": calendar_id,
-                "checked_range": {"start": start_dt.isoformat(), "end": end_dt.isoformat()},
-                "returned_slots_count": 0,
-                "filtered_slots_count": 0,
-                "reason": reason,
-                "checked_at": now.isoformat(),
-            },
-        }
-        return out_text, last_offer
-    except Exception as e:
-        # HTTP errors or unknown errors
-        import httpx
-        if isinstance(e, httpx.HTTPStatusError):
-            reason = "http_error"
-        else:
-            reason = "unknown_error"
-        out_text = (
-            "Quick one — I'm having trouble reaching the calendar right now. "
-            "What day works best for you, and would morning, afternoon, or evening be ideal?"
+    except _SlotsUnavailableError as e:
+        last_offer = _empty_offer(
+            e.reason,
+            calendar_id=calendar_id,
+            checked_range=checked_range,
+            constraints=base_constraints,
+            timezone=timezone,
+            now=now,
         )
-        last_offer = {
-            "slots": [],
-            "offered_slots": [],
-            "constraints": {
-                "day": getattr(route_info.signals, "day", None),
-                "time_window": getattr(route_info.signals, "time_window", None),
-                "explicit_time": getattr(route_info.signals, "explicit_time", None),
-            },
-            "offered_at": now.isoformat(),
-            "timezone": timezone,
-            "calendar_check": {
-                "ok": False,
-                "trace_id": None,
-                "calendar_id": calendar_id,
-                "checked_range": {"start": start_dt.isoformat(), "end": end_dt.isoformat()},
-                "returned_slots_count": 0,
-                "filtered_slots_count": 0,
-                "reason": reason,
-                "checked_at": now.isoformat(),
-            },
-        }
-        return out_text, last_offer
+        return _CALENDAR_UNREACHABLE_TEXT, last_offer
 
     # 5) Apply optional availability window filtering (only if configured)
     if availability_windows:
@@ -795,37 +1131,32 @@ async def _handle_offer_slots(
         slots_after_windows = all_slots
 
     # 6) Filter by extracted signals (day, time_window, explicit_date)
-    signals = route_info.signals
     filtered = filter_slots_by_signals(
         slots_after_windows,
-        day=signals.day,
-        time_window=signals.time_window,
+        day=sig_day,
+        time_window=sig_window,
         timezone=timezone,
-        explicit_date=getattr(signals, "explicit_date", None),
+        explicit_date=sig_explicit_date,
     )
 
     # 6b) If explicit_time is given (e.g. "2:00" from "between 2-5"), use it as a
     # floor so we only offer slots at or after that hour within the time window.
-    explicit_time_signal = getattr(signals, "explicit_time", None)
-    if explicit_time_signal and filtered:
-        floor_hour = _parse_explicit_time_to_hour(explicit_time_signal)
+    if sig_explicit_time and filtered:
+        floor_hour = _parse_explicit_time_to_hour(sig_explicit_time)
         if floor_hour is not None:
-            _tz_obj = ZoneInfo(timezone)
-            _floored = []
-            for _iso in filtered:
-                try:
-                    _dt = datetime.fromisoformat(_iso.replace("Z", "+00:00"))
-                    _local = _dt.astimezone(_tz_obj)
-                    if _local.hour + _local.minute / 60 >= floor_hour:
-                        _floored.append(_iso)
-                except ValueError:
-                    continue
+            _tz_obj = _TZ(timezone)
+            floor_minutes = round(floor_hour * 60)  # whole minutes, compared as ints
+            _floored = [
+                _iso
+                for _iso, _dt in _parse_slots(filtered)
+                if (_local := _dt.astimezone(_tz_obj)).hour * 60 + _local.minute >= floor_minutes
+            ]
             if _floored:
                 filtered = _floored
 
     # 7) Pick exactly 2 slots: A=preference match, B=contrasting or next-closest
     base_slots = filtered if filtered else slots_after_windows
-    has_time_preference = bool(signals.day or signals.time_window)
+    has_time_preference = bool(sig_day or sig_window)
     offered_slots = pick_soonest_two_slots(
         base_slots,
         timezone=timezone,
@@ -839,7 +1170,7 @@ async def _handle_offer_slots(
         "ok": len(offered_slots) > 0,
         "trace_id": trace_id,
         "calendar_id": calendar_id,
-        "checked_range": {"start": start_dt.isoformat(), "end": end_dt.isoformat()},
+        "checked_range": checked_range,
         "returned_slots_count": len(all_slots),
         "filtered_slots_count": len(slots_after_windows),
         "reason": None,
@@ -854,12 +1185,7 @@ async def _handle_offer_slots(
         calendar_check["reason"] = "filtered_out_all"
 
     # 9) Build constraints for storage
-    constraints = {
-        "day": signals.day,
-        "time_window": signals.time_window,
-        "explicit_time": signals.explicit_time,
-        "explicit_date": getattr(signals, "explicit_date", None),
-    }
+    constraints = {**base_constraints, "explicit_date": sig_explicit_date}
 
     # 10) Format for display (in tenant local time)
     display_slots = format_slots_for_display(offered_slots, timezone=timezone)
@@ -884,15 +1210,18 @@ async def _handle_offer_slots(
         "offered_slots": offered_slots,  # Duplicate for explicit observability
         "constraints": constraints,
         "offered_at": now.isoformat(),
+        "offered_epoch": int(now.timestamp()),
         "timezone": timezone,
         "calendar_check": calendar_check,
+        "display_slots": display_slots,
+        "slots_soa": _slots_soa(offered_slots, timezone),
     }
 
     return out_text, last_offer
 
 
 async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
-    row = await conn.fetchrow(LOAD_JOB_EVENT_SQL, job_id)
+    row = await (await prepared(conn, LOAD_JOB_EVENT_SQL)).fetchrow(job_id)
     if not row:
         # This should be rare; job_id exists but join failed
         raise RuntimeError(f"Job not found or missing inbound_event join: {job_id}")
@@ -915,6 +1244,9 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
         trace_id=trace_id,
     )
 
+    # One clock reading per job, threaded through the handlers
+    now = datetime.now(_LONDON)
+
     text = _extract_text(ev.payload)
     display_name = _extract_display_name(ev.payload)
 
@@ -927,44 +1259,58 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
     if ghl_contact_id:
         contact_meta = {"contactId": ghl_contact_id, **contact_meta}
 
-    # Contact
-    contact_id = await conn.fetchval(
-        UPSERT_CONTACT_SQL,
-        ev.tenant_id,
-        ev.channel,
-        ev.channel_address,
-        display_name,
-        contact_meta,  # Pass dict directly - asyncpg codec handles JSON encoding
-    )
-
-
-    # Load tenant settings (needed for both flows)
-    try:
-        tenant = await load_tenant(conn, ev.tenant_id)
-    except Exception as e:
-        tenant = {}
-        print(f"WARN: Failed to load tenant {ev.tenant_id}: {e}")
-
+    # Each entry point upserts the contact and resolves its conversation in one
+    # statement; tenant settings (needed for both flows) then load on the same
+    # connection. load_tenant's cache makes that a round trip only on a miss,
+    # and the job never waits on a second pool connection while holding this one.
     if ev.event_type == "new_lead":
         # new_lead: upsert conversation (creates it if this is the first touch)
-        conversation_id = await conn.fetchval(
-            UPSERT_OPEN_CONVERSATION_SQL,
-            ev.tenant_id, contact_id,
+        conv_row = await (await prepared(conn, UPSERT_CONTACT_AND_OPEN_CONVERSATION_SQL)).fetchrow(
+            ev.tenant_id,
+            ev.channel,
+            ev.channel_address,
+            display_name,
+            contact_meta,  # Pass dict directly - asyncpg codec handles JSON encoding
         )
-        context_row = await conn.fetchval(LOAD_CONVERSATION_CONTEXT_SQL, conversation_id)
-        conv_context = _coerce_payload(context_row)
+        tenant = await _load_tenant_or_empty(conn, ev.tenant_id)
+        contact_id = conv_row["contact_id"]
+        conversation_id = conv_row["conversation_id"]
+        conv_context = _coerce_payload(conv_row["context"])
         result = await _handle_new_lead(
-            conn, ev, contact_id, conversation_id, conv_context, display_name, tenant
+            conn, ev, contact_id, conversation_id, conv_context, display_name, tenant, now
         )
         result["job_id"] = job_id
         return result
 
     # inbound_message: only process if an open bot conversation already exists
-    conversation_id = await conn.fetchval(
-        FIND_OPEN_CONVERSATION_SQL,
-        ev.tenant_id, contact_id,
+    # Route the inbound message (for signal extraction + payload metadata)
+    route_info = route_from_text(text)
+    route_info_dict = route_info_to_dict(route_info)
+
+    # Stamp route_info onto the inbound payload in place: ev.payload is this job's
+    # own dict (decoded from the jobs row), so there is nothing to copy it for
+    ev.payload["route_info"] = route_info_dict
+    inbound_payload = ev.payload
+
+    # Upsert the contact, find the open conversation and store the message (idempotent)
+    conv_row = await (await prepared(conn, UPSERT_CONTACT_AND_INSERT_INBOUND_SQL)).fetchrow(
+        ev.tenant_id,
+        ev.channel,
+        ev.channel_address,
+        display_name,
+        contact_meta,  # Pass dict directly - asyncpg codec handles JSON encoding
+        text,
+        ev.provider,
+        ev.provider_msg_id,
+        ev.dedupe_key,
+        inbound_payload,
+        ev.inbound_event_id,
+        ev.event_type,
+        ev.trace_id,
     )
-    if not conversation_id:
+    tenant = await _load_tenant_or_empty(conn, ev.tenant_id)
+    contact_id = conv_row["contact_id"]
+    if conv_row["conversation_id"] is None:
         return {
             "job_id": job_id,
             "tenant_id": ev.tenant_id,
@@ -979,64 +1325,9 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
             "trace_id": ev.trace_id,
         }
 
-    # Load conversation context
-    context_row = await conn.fetchval(LOAD_CONVERSATION_CONTEXT_SQL, conversation_id)
-    conv_context = _coerce_payload(context_row)
-
-    # Route the inbound message (for signal extraction + payload metadata)
-    route_info = route_from_text(text)
-    route_info_dict = route_info_to_dict(route_info)
-
-    # Build inbound payload with route_info
-    inbound_payload = dict(ev.payload)
-    inbound_payload["route_info"] = route_info_dict
-
-    # Defensive guard: ensure route_info is always a dict, not a list
-    ri = inbound_payload.get("route_info")
-    if isinstance(ri, list):
-        if len(ri) == 1 and isinstance(ri[0], dict):
-            inbound_payload["route_info"] = ri[0]
-        else:
-            inbound_payload["route_info"] = {
-                "route": "unknown",
-                "signals": {},
-                "confidence": 0.0,
-                "error": f"bad_route_info_type:{type(ri).__name__}",
-            }
-    elif not isinstance(ri, dict):
-        inbound_payload["route_info"] = {
-            "route": "unknown",
-            "signals": {},
-            "confidence": 0.0,
-            "error": f"bad_route_info_type:{type(ri).__name__}",
-        }
-
-    # Defensive guard: ensure inbound_payload is always a dict before insert
-    if isinstance(inbound_payload, list):
-        inbound_payload = inbound_payload[-1] if inbound_payload else {}
-    assert isinstance(inbound_payload, dict), f"inbound_payload must be dict, got {type(inbound_payload)}"
-
-    print("DEBUG route_info typeof:", type(inbound_payload.get("route_info")), inbound_payload.get("route_info"))
-
-    # Pass dict directly - asyncpg codec handles JSON encoding (don't double-encode)
-    # Message (idempotent) - $12 = trace_id for glass-box tracing
-    message_id = await conn.fetchval(
-        INSERT_INBOUND_MESSAGE_IDEMPOTENT_SQL,
-        ev.tenant_id,
-        conversation_id,
-        contact_id,
-        text,
-        ev.provider,
-        ev.provider_msg_id,
-        ev.channel,
-        ev.dedupe_key,
-        inbound_payload,  # Pass dict, not json.dumps() string
-        ev.inbound_event_id,
-        ev.event_type,
-        ev.trace_id,  # $12 - propagate trace_id
-    )
-
-    await conn.execute(UPDATE_CONVERSATION_LAST_INBOUND_SQL, conversation_id)
+    conversation_id = conv_row["conversation_id"]
+    conv_context = _coerce_payload(conv_row["context"])
+    message_id = conv_row["message_id"]
 
     # --- Debounce: aggregate rapid-fire messages from same contact ---
     siblings = await find_and_claim_siblings(conn, ev.tenant_id, job_id, ev.channel_address)
@@ -1045,8 +1336,7 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
         for sib in siblings:
             sib_text = sib.get("text") or ""
             if sib_text:
-                await conn.fetchval(
-                    INSERT_INBOUND_MESSAGE_IDEMPOTENT_SQL,
+                await (await prepared(conn, INSERT_INBOUND_MESSAGE_IDEMPOTENT_SQL)).fetchval(
                     ev.tenant_id,
                     conversation_id,
                     contact_id,
@@ -1065,24 +1355,24 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
         # Mark sibling jobs as done (aggregated into this job)
         sib_ids = [s["job_id"] for s in siblings]
         await mark_siblings_done(conn, sib_ids, job_id)
-        print(f"DEBUG debounce: aggregated {len(siblings)} sibling message(s) into job {job_id}")
+        logger.debug("debounce: aggregated %d sibling message(s) into job %s", len(siblings), job_id)
 
     # State for response generation
-    from zoneinfo import ZoneInfo
-    tz = ZoneInfo("Europe/London")
-    now = datetime.now(tz)
-
     route = "unclear"
     new_last_offer = None
     context_updates: dict[str, Any] = {}
     booking_result = None
     slot_matched = None
-    llm_result: dict[str, Any] = {"used": False, "error": None, "intent": "unclear",
-                                   "reply_text": "Got it — what day and time works best for you?"}
+    llm_result: Mapping[str, Any] = {"used": False, "error": None, "intent": "unclear",
+                                     "reply_text": "Got it — what day and time works best for you?"}
 
     booked_booking = conv_context.get("booked_booking")
     handoff_info = conv_context.get("handoff_requested")
     last_offer = conv_context.get("last_offer")
+    # Slot of the current booking, if any (str only — anything else counts as not booked)
+    booked_slot = booked_booking.get("slot") if isinstance(booked_booking, dict) else None
+    if not isinstance(booked_slot, str):
+        booked_slot = None
 
     bot_settings = get_bot_settings(tenant)
     llm_settings = get_llm_settings(tenant)
@@ -1094,31 +1384,45 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
 
     else:
         # LLM-driven intent classification + reply composition
+        if llm_enabled(llm_settings):
+            # Load recent conversation history for LLM context
+            msg_rows = await (await prepared(conn, LOAD_RECENT_MESSAGES_SQL)).fetch(conversation_id)
+            # Build the history and its prompt transcript (all but the latest message) in one pass
+            conversation_history: list[dict] = []
+            history_parts: list[str] = []
+            for r in msg_rows:
+                if conversation_history:
+                    prev = conversation_history[-1]
+                    history_parts.append(format_history_line(prev["role"], prev["text"]))
+                conversation_history.append(
+                    {"role": "user" if r["direction"] == "inbound" else "assistant", "text": r["text"]}
+                )
 
-        # Load recent conversation history for LLM context
-        msg_rows = await conn.fetch(LOAD_RECENT_MESSAGES_SQL, conversation_id)
-        conversation_history = [
-            {"role": "user" if r["direction"] == "inbound" else "assistant", "text": r["text"]}
-            for r in msg_rows
-        ]
-
-        # Get active offered slots (only if not expired)
-        offered_slots: list[str] = []
-        display_slots: list[str] = []
-        if last_offer and isinstance(last_offer.get("offered_slots"), list):
-            if not _is_offer_expired(last_offer.get("offered_at", "")):
-                offered_slots = last_offer["offered_slots"]
-                offer_tz = last_offer.get("timezone", "Europe/London")
-                display_slots = format_slots_for_display(offered_slots, timezone=offer_tz)
-
-        # LLM classifies intent + composes reply
-        llm_result = await process_inbound_message(
-            conversation_history=conversation_history,
-            offered_slots=offered_slots,
-            display_slots=display_slots,
-            bot_settings=bot_settings,
-            llm_settings=llm_settings,
-        )
+            # Get active offered slots (only if not expired)
+            offered_slots: list[str] = []
+            display_slots: list[str] = []
+            if last_offer and isinstance(last_offer.get("offered_slots"), list):
+                if not _is_offer_expired(last_offer, now=now):
+                    offered_slots = last_offer["offered_slots"]
+                    # Offers store their display strings; older ones are formatted here
+                    display_slots = last_offer.get("display_slots") or format_slots_for_display(
+                        offered_slots, timezone=last_offer.get("timezone", "Europe/London"),
+                    )
+
+            # LLM classifies intent + composes reply
+            llm_result = await process_inbound_message(
+                conversation_history=conversation_history,
+                offered_slots=offered_slots,
+                display_slots=display_slots,
+                bot_settings=bot_settings,
+                llm_settings=llm_settings,
+                history_prefix="\n".join(history_parts),
+            )
+        else:
+            # LLM off: no history, transcript or slot formatting to build
+            logger.warning("process_job: LLM disabled — bot silent for this turn")
+            offered_slots = []
+            llm_result = LLM_DISABLED_RESULT
 
         intent = llm_result["intent"]
         route = intent
@@ -1140,16 +1444,17 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
         out_text = llm_preamble
 
         # Calendar adapter for booking/cancel operations
-        cal_adapter = await get_calendar_adapter(conn, ev.tenant_id)
+        cal_adapter = await get_calendar_adapter(conn, ev.tenant_id, tenant=tenant or None)
 
         if intent == "reschedule":
-            if booked_booking and isinstance(booked_booking.get("slot"), str):
+            if booked_slot is not None:
                 cancel_result = await cal_adapter.cancel_booking(
                     booking_id=booked_booking["booking_id"],
                 )
                 if cancel_result.get("success"):
+                    _invalidate_slots_cache(ev.tenant_id)
                     context_updates["booked_booking"] = None
-                    slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, route_info)
+                    slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, route_info, now=now)
                     context_updates["last_offer"] = new_last_offer
                     _cancel_preamble = llm_preamble or "No problem, I've cancelled your booking!"
                     out_text = f"{_cancel_preamble} {slot_text}"
@@ -1159,7 +1464,7 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                     route = "reschedule_failed"
             else:
                 # No existing booking — just offer slots
-                slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, route_info)
+                slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, route_info, now=now)
                 context_updates["last_offer"] = new_last_offer
                 _reschedule_preamble = llm_preamble or ""
                 out_text = f"{_reschedule_preamble} {slot_text}".strip()
@@ -1171,6 +1476,7 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                     booking_id=booked_booking["booking_id"],
                 )
                 if cancel_result.get("success"):
+                    _invalidate_slots_cache(ev.tenant_id)
                     context_updates["booked_booking"] = None
                     _cancel_preamble = llm_preamble or "No problem, your appointment has been cancelled."
                     out_text = f"{_cancel_preamble} Let me know if you'd like to rebook."
@@ -1182,13 +1488,13 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                 out_text = llm_preamble or "It doesn't look like you have an active booking to cancel. Would you like to book a time?"
                 route = "cancel_no_booking"
 
-        elif booked_booking and isinstance(booked_booking.get("slot"), str):
+        elif booked_slot is not None:
             # Already booked — let conversational intents through, block re-booking
             if intent in ("engage", "wants_human", "decline", "unclear"):
                 pass  # out_text already set from LLM, fall through to handlers below
             else:
                 # Trying to book again — idempotent reply
-                slot_display = _format_slot_for_confirmation(booked_booking["slot"])
+                slot_display = _format_slot_for_confirmation(booked_slot)
                 out_text = f"You're already booked in for {slot_display}. See you then!"
                 route = "already_booked"
 
@@ -1204,6 +1510,7 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                     metadata={"source": "chatbot"},
                 )
                 if booking_result.get("success"):
+                    _invalidate_slots_cache(ev.tenant_id)
                     _confirmation = _build_booking_confirmation(slot_iso, bot_settings["booking_confirmation_template"])
                     out_text = _confirmation
                     route = "booked"
@@ -1232,27 +1539,34 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
             explicit_time = llm_result.get("explicit_time") or ""
             target_hour = _parse_explicit_time_to_hour(explicit_time) if explicit_time else None
 
-            # Fetch all available slots via calendar adapter
-            tenant_for_slots = await load_tenant(conn, ev.tenant_id)
+            # Fetch all available slots via calendar adapter — only when there is a
+            # target time to match; otherwise the fallback offer below fetches its own
+            tenant_for_slots = tenant or await load_tenant(conn, ev.tenant_id)
             booking_cfg_for_slots = get_booking_config(tenant_for_slots)
             tz_str = booking_cfg_for_slots.get("timezone", "Europe/London")
 
             all_slots_for_specific: list[str] = []
-            _start = now
-            _end = now + timedelta(days=14)
-            try:
-                all_slots_for_specific, _ = await cal_adapter.get_free_slots(
-                    start_dt=_start,
-                    end_dt=_end,
-                    timezone=tz_str,
-                )
-            except Exception:
-                pass
+            if target_hour is not None:
+                _start = now
+                _end = now + timedelta(days=14)
+                try:
+                    all_slots_for_specific, _ = await _get_free_slots_cached(
+                        cal_adapter,
+                        ev.tenant_id,
+                        get_calendar_settings(tenant_for_slots).get("calendar_id"),
+                        start_dt=_start,
+                        end_dt=_end,
+                        timezone=tz_str,
+                    )
+                except Exception:
+                    pass
 
             if target_hour is not None and all_slots_for_specific:
-                nearest = _find_nearest_slot(
-                    all_slots_for_specific, preferred_day, target_hour, tz_str, tolerance_minutes=45
+                # Score the slots once; both the exact match and the alternatives read from it
+                ranked_slots = _rank_slots_by_hour(
+                    all_slots_for_specific, preferred_day, target_hour, tz_str, limit=2,
                 )
+                nearest = _nearest_from_ranked(ranked_slots, tolerance_minutes=45)
                 if nearest:
                     # Found a slot close enough — book it
                     slot_matched = nearest
@@ -1263,6 +1577,7 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                         metadata={"source": "chatbot"},
                     )
                     if booking_result.get("success"):
+                        _invalidate_slots_cache(ev.tenant_id)
                         _confirmation = _build_booking_confirmation(nearest, bot_settings["booking_confirmation_template"])
                         out_text = _confirmation
                         route = "booked"
@@ -1286,7 +1601,7 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                         route = "booking_failed"
                 else:
                     # Nothing close — offer 2 nearest alternatives
-                    alts = _find_two_nearest_slots(all_slots_for_specific, preferred_day, target_hour, tz_str)
+                    alts = _two_nearest_from_ranked(ranked_slots)
                     display_alts = format_slots_for_display(alts, timezone=tz_str)
                     if display_alts:
                         if len(display_alts) >= 2:
@@ -1294,7 +1609,13 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                         else:
                             _alt_offer = f"I don't have {explicit_time} I'm afraid. Nearest I've got is {display_alts[0]} — does that work?"
                         out_text = f"{llm_preamble} {_alt_offer}".strip() if llm_preamble else _alt_offer
-                        new_last_offer = {"offered_slots": alts, "offered_at": now.isoformat(), "timezone": tz_str}
+                        new_last_offer = {
+                            "offered_slots": alts,
+                            "offered_at": now.isoformat(),
+                            "offered_epoch": int(now.timestamp()),
+                            "timezone": tz_str,
+                            "display_slots": display_alts,
+                        }
                         context_updates["last_offer"] = new_last_offer
                     else:
                         out_text = f"I'm afraid I don't have {explicit_time} available. What other times work for you?"
@@ -1303,16 +1624,11 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                 # Couldn't parse time or no slots — fall back to broad offer, preserving day preference
                 _fallback_day = llm_result.get("preferred_day")
                 if _fallback_day:
-                    class _FallbackSignals:
-                        day = _fallback_day
-                        time_window = None
-                        explicit_time = None
-                    class _FallbackRouteInfo:
-                        route = "offer_slots"
-                        signals = _FallbackSignals()
-                    _slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, _FallbackRouteInfo())
+                    _slot_text, new_last_offer = await _handle_offer_slots(
+                        conn, ev.tenant_id, _OfferRouteInfo(Signals(day=_fallback_day)), now=now,
+                    )
                 else:
-                    _slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, _NullRouteInfo())
+                    _slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, _NullRouteInfo(), now=now)
                 out_text = f"{llm_preamble} {_slot_text}".strip() if llm_preamble else _slot_text
                 context_updates["last_offer"] = new_last_offer
                 route = "offer_slots"
@@ -1333,42 +1649,42 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                 _resolved_time_window = preferred_time or _pm_time_window
                 _resolved_explicit_time = _pm_explicit_time
                 _resolved_explicit_date = getattr(_pm_sig, "explicit_date", None)
-                class _LLMSignals:
-                    day = _resolved_day
-                    time_window = _resolved_time_window
-                    explicit_time = _resolved_explicit_time
-                    explicit_date = _resolved_explicit_date
-                class _LLMRouteInfo:
-                    route = "offer_slots"
-                    signals = _LLMSignals()
-                slot_route_info = _LLMRouteInfo()
+                slot_route_info = _OfferRouteInfo(Signals(
+                    day=_resolved_day,
+                    time_window=_resolved_time_window,
+                    explicit_time=_resolved_explicit_time,
+                    explicit_date=_resolved_explicit_date,
+                ))
             else:
                 slot_route_info = route_info
-            slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, slot_route_info)
+            slot_text, new_last_offer = await _handle_offer_slots(conn, ev.tenant_id, slot_route_info, now=now)
             context_updates["last_offer"] = new_last_offer
             route = "offer_slots"
             # Check if the day/date preference was satisfied; if not, say so
             # Use resolved_day (which may come from pattern matcher) not just LLM preferred_day
-            _pm_check_day = getattr(route_info.signals, "day", None)
+            _pm_check_day = route_info.signals.day
             if _pm_check_day in ("today", "tomorrow"):
                 _pm_check_day = None
             _check_day = preferred_day or _pm_check_day
-            _check_date = getattr(route_info.signals, "explicit_date", None)
+            _check_date = route_info.signals.explicit_date
             day_preamble = ""
             if (_check_day or _check_date) and new_last_offer.get("offered_slots"):
-                offer_tz = new_last_offer.get("timezone", "Europe/London")
-                _tz = ZoneInfo(offer_tz)
-                slot_days = []
-                slot_dates = []
-                for _s in new_last_offer["offered_slots"]:
-                    _dt = datetime.fromisoformat(_s)
-                    if _dt.tzinfo is None:
-                        _dt = _dt.replace(tzinfo=_tz)
+                # Local weekday/day-of-month come precomputed with the offer
+                soa = new_last_offer.get("slots_soa") or _slots_soa(
+                    new_last_offer["offered_slots"], new_last_offer.get("timezone", "Europe/London")
+                )
+                slot_weekdays = soa["weekday"]
+                slot_dates = soa["day"]
+                if not _check_day:
+                    day_matched = True
+                else:
+                    _check_day_lc = _check_day.lower()
+                    _check_wd = _DAY_MAP.get(_check_day_lc)
+                    if _check_wd is not None:
+                        day_matched = _check_wd in slot_weekdays
                     else:
-                        _dt = _dt.astimezone(_tz)
-                    slot_days.append(_dt.strftime("%A").lower())
-                    slot_dates.append(_dt.day)
-                day_matched = (not _check_day) or any(_check_day.lower() in _d for _d in slot_days)
+                        # Abbreviations ("tue", "thurs") still match by substring
+                        day_matched = any(_check_day_lc in _WEEKDAY_NAMES[wd] for wd in slot_weekdays)
                 date_matched = (_check_date is None) or (_check_date in slot_dates)
                 if not day_matched or not date_matched:
                     if _check_day and _check_date:
@@ -1393,7 +1709,7 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
                 route = "handoff_to_booking"
                 llm_preamble = llm_result.get("reply_text", "").strip()
                 slot_text, new_last_offer = await _handle_offer_slots(
-                    conn, ev.tenant_id, _NullRouteInfo(),
+                    conn, ev.tenant_id, _NullRouteInfo(), now=now,
                 )
                 if new_last_offer:
                     context_updates["last_offer"] = new_last_offer
@@ -1416,13 +1732,36 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
 
         # else intent == "unclear" — LLM reply_text already set as clarifying question
 
-    # Store context updates if any
-    if context_updates:
-        await conn.execute(UPDATE_CONVERSATION_CONTEXT_SQL, conversation_id, context_updates)
+    # Glass-box: build debug snapshot for conversation context
+    state_from = conv_context.get("_last_step", "start")
+    state_to = route
 
-    # Close conversation on terminal outcomes
-    if route in ("decline",):
-        await conn.execute(CLOSE_CONVERSATION_SQL, conversation_id)
+    # Signals, transition and human-readable offered slots are built once and
+    # shared by the debug snapshot and the log record
+    signal_view = {
+        "day": route_info.signals.day,
+        "time_window": route_info.signals.time_window,
+        "explicit_time": route_info.signals.explicit_time,
+    }
+    transition = {"from": state_from, "to": state_to}
+    offered_slot_views = [
+        {"iso": s, "human": _format_slot_for_confirmation(s)}
+        for s in new_last_offer["slots"]
+    ] if new_last_offer else None
+
+    debug_snapshot = build_debug_snapshot(
+        route=route,
+        signals=signal_view,
+        slot_count=len(new_last_offer["slots"]) if new_last_offer else 0,
+        chosen_slots=offered_slot_views,
+        transition=transition,
+    )
+
+    # Route context updates, then the debug snapshot (debug keys win, as when
+    # they were applied second); written below together with the outbound message
+    context_updates["debug"] = {"last_run": debug_snapshot}
+    context_updates["_last_step"] = state_to
+    close_conversation = route in ("decline",)
 
     # Create pending outbound message (skip if LLM disabled — bot goes silent)
     out_message_id = None
@@ -1446,8 +1785,8 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
         if booking_result:
             out_payload_dict["booking_result"] = booking_result
 
-        out_message_id = await conn.fetchval(
-            INSERT_OUTBOUND_MESSAGE_SQL,
+        # Outbound insert and the end-of-turn conversation write in one round trip
+        out_message_id = await (await prepared(conn, INSERT_OUTBOUND_AND_FINALIZE_INBOUND_SQL)).fetchval(
             ev.tenant_id,
             conversation_id,
             contact_id,
@@ -1456,30 +1795,13 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
             out_text,
             out_payload_dict,  # Pass dict directly - asyncpg codec handles JSON encoding
             ev.trace_id,  # $8 - propagate trace_id
+            context_updates,
+            close_conversation,
+        )
+    else:
+        await (await prepared(conn, FINALIZE_INBOUND_CONVERSATION_SQL)).fetchval(
+            conversation_id, context_updates, close_conversation,
         )
-
-    # Glass-box: build debug snapshot for conversation context
-    state_from = conv_context.get("_last_step", "start")
-    state_to = route
-
-    debug_snapshot = build_debug_snapshot(
-        route=route,
-        signals={
-            "day": route_info.signals.day,
-            "time_window": route_info.signals.time_window,
-            "explicit_time": route_info.signals.explicit_time,
-        },
-        slot_count=len(new_last_offer["slots"]) if new_last_offer else 0,
-        chosen_slots=[
-            {"iso": s, "human": _format_slot_for_confirmation(s)}
-            for s in (new_last_offer["slots"] if new_last_offer else [])
-        ] if new_last_offer else None,
-        transition={"from": state_from, "to": state_to},
-    )
-
-    # Update conversation context with debug snapshot
-    debug_context = {"debug": {"last_run": debug_snapshot}, "_last_step": state_to}
-    await conn.execute(UPDATE_CONVERSATION_CONTEXT_SQL, conversation_id, debug_context)
 
     # Glass-box: structured logging
     tenant_slug = tenant.get("tenant_slug", ev.tenant_id)
@@ -1499,18 +1821,11 @@ async def process_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
         conversation_id=conversation_id,
         trace_id=ev.trace_id,
         route=route,
-        signals={
-            "day": route_info.signals.day,
-            "time_window": route_info.signals.time_window,
-            "explicit_time": route_info.signals.explicit_time,
-        },
+        signals=signal_view,
         calendar_result=calendar_result,
-        offered_slots=[
-            {"iso": s, "human": _format_slot_for_confirmation(s)}
-            for s in (new_last_offer["slots"] if new_last_offer else [])
-        ] if new_last_offer else None,
+        offered_slots=offered_slot_views,
         chosen_slot={"iso": slot_matched, "human": _format_slot_for_confirmation(slot_matched)} if slot_matched else None,
-        state_transition={"from": state_from, "to": state_to},
+        state_transition=transition,
     )
 
     return {
@@ -1545,9 +1860,6 @@ WHERE jq.job_id = $1::uuid;
 
 async def process_reengage_job(conn: asyncpg.Connection, job_id: str) -> dict[str, Any]:
     """Process a re-engagement job: compose and send a follow-up message."""
-    import logging
-    _logger = logging.getLogger(__name__)
-
     row = await conn.fetchrow(LOAD_REENGAGE_JOB_SQL, job_id)
     if not row:
         raise RuntimeError(f"Reengage job not found: {job_id}")
@@ -1561,17 +1873,17 @@ async def process_reengage_job(conn: asyncpg.Connection, job_id: str) -> dict[st
 
     # Guard: conversation must still be open
     if row["conv_status"] != "open":
-        _logger.info("reengage: skipping %s — conversation %s is %s", job_id, conversation_id, row["conv_status"])
+        logger.info("reengage: skipping %s — conversation %s is %s", job_id, conversation_id, row["conv_status"])
         return {"job_id": job_id, "route": "reengage_skipped", "reason": "not_open"}
 
     # Guard: already booked
     if context.get("booked_booking"):
-        _logger.info("reengage: skipping %s — already booked", job_id)
+        logger.info("reengage: skipping %s — already booked", job_id)
         return {"job_id": job_id, "route": "reengage_skipped", "reason": "already_booked"}
 
     # Guard: declined
     if context.get("declined"):
-        _logger.info("reengage: skipping %s — declined", job_id)
+        logger.info("reengage: skipping %s — declined", job_id)
         return {"job_id": job_id, "route": "reengage_skipped", "reason": "declined"}
 
     # Load tenant + settings
@@ -1584,7 +1896,7 @@ async def process_reengage_job(conn: asyncpg.Connection, job_id: str) -> dict[st
     bump_number = reengage_count + 1
 
     # Load conversation history for LLM context
-    msg_rows = await conn.fetch(LOAD_RECENT_MESSAGES_SQL, conversation_id)
+    msg_rows = await (await prepared(conn, LOAD_RECENT_MESSAGES_SQL)).fetch(conversation_id)
     conversation_history = [
         {"role": "user" if r["direction"] == "inbound" else "assistant", "text": r["text"]}
         for r in msg_rows
@@ -1621,8 +1933,7 @@ async def process_reengage_job(conn: asyncpg.Connection, job_id: str) -> dict[st
         },
     }
 
-    out_message_id = await conn.fetchval(
-        INSERT_OUTBOUND_MESSAGE_SQL,
+    out_message_id = await (await prepared(conn, INSERT_OUTBOUND_MESSAGE_SQL)).fetchval(
         tenant_id,
         conversation_id,
         contact_id,
@@ -1636,16 +1947,17 @@ async def process_reengage_job(conn: asyncpg.Connection, job_id: str) -> dict[st
     # Update conversation context
     context_updates: dict[str, Any] = {
         "reengage_count": bump_number,
-        "last_reengage_at": datetime.now(ZoneInfo("UTC")).isoformat(),
+        "last_reengage_at": datetime.now(_UTC).isoformat(),
     }
-    await conn.execute(UPDATE_CONVERSATION_CONTEXT_SQL, conversation_id, context_updates)
-
-    # If this was the last bump, close the conversation
-    if bump_number >= max_attempts:
-        await conn.execute(CLOSE_CONVERSATION_SQL, conversation_id)
-        _logger.info("reengage: max bumps reached for %s — closing conversation", conversation_id)
+    # The last bump also closes the conversation (same UPDATE)
+    close_conversation = bump_number >= max_attempts
+    await (await prepared(conn, UPDATE_CONVERSATION_CONTEXT_SQL)).fetchval(
+        conversation_id, context_updates, close_conversation,
+    )
+    if close_conversation:
+        logger.info("reengage: max bumps reached for %s — closing conversation", conversation_id)
 
-    _logger.info(
+    logger.info(
         "reengage: sent bump %d/%d for conversation %s (message %s)",
         bump_number, max_attempts, conversation_id, out_message_id,
     )
@@ -18,6 +18,8 @@ from app.bot.tenants import load_tenant, get_bot_settings, get_booking_config
 
 logger = logging.getLogger(__name__)
 
+_LONDON = ZoneInfo("Europe/London")  # fallback when a tenant timezone is invalid
+
 
 # ── SQL ─────────────────────────────────────────────────────────────
 
@@ -67,7 +69,7 @@ def is_within_business_hours(
     try:
         tz = ZoneInfo(tz_name)
     except Exception:
-        tz = ZoneInfo("Europe/London")
+        tz = _LONDON
 
     now_local = datetime.now(tz)
 
@@ -1,7 +1,16 @@
 from __future__ import annotations
+from bisect import bisect_left
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Optional
-import re
+
+# google-re2 when installed (linear-time matching); the stdlib otherwise.
+# Patterns below stick to the RE2-compatible subset and use inline (?i)
+# rather than re.IGNORECASE, whose flag constant re2 doesn't expose.
+try:
+    import re2 as _re
+except ImportError:
+    import re as _re
 
 # Day patterns with normalization (include plurals)
 DAY_PATTERNS = {
@@ -22,11 +31,21 @@ TIME_WINDOW_PATTERNS = {
     r"\bevening\b": "evening",
 }
 
+# All day patterns as one alternation so extract_signals scans the text once;
+# the named group that matched gives the normalized day.
+_DAY_RE = _re.compile(
+    "(?i)" + "|".join(f"(?P<{day_name}>{p})" for p, day_name in DAY_PATTERNS.items())
+)
+# Same for the time-window keywords; priority among them is TIME_WINDOW_PATTERNS order
+_TIME_WINDOW_RE = _re.compile(
+    "(?i)" + "|".join(f"(?P<{window}>{p})" for p, window in TIME_WINDOW_PATTERNS.items())
+)
+_TIME_WINDOW_ORDER = tuple(TIME_WINDOW_PATTERNS.values())
+
 # Patterns for inferring time window from numeric ranges
 # "after 12", "from 12", "between 12 and 3", "12-3"
-TIME_RANGE_PATTERN = re.compile(
-    r"(?:after|from|between)?\s*(\d{1,2})(?:\s*(?:pm|am))?\s*(?:and|to|but before|-|–)?\s*(\d{1,2})?(?:\s*(?:pm|am))?",
-    re.IGNORECASE
+TIME_RANGE_PATTERN = _re.compile(
+    r"(?i)(?:after|from|between)?\s*(\d{1,2})(?:\s*(?:pm|am))?\s*(?:and|to|but before|-|–)?\s*(\d{1,2})?(?:\s*(?:pm|am))?"
 )
 
 
@@ -48,26 +67,30 @@ def _infer_time_window_from_hours(hour_start: int, hour_end: Optional[int] = Non
         return "evening"
     return None
 
-# Matches times like "2pm", "2:30pm", "14:00", "2 pm"
-TIME_REGEX = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\b", re.IGNORECASE)
 
+# _infer_time_window_from_hours for every hour TIME_REGEX can capture (\d{1,2}),
+# so extract_signals does a tuple index instead of the comparison chain
+_HOUR_TIME_WINDOWS = tuple(_infer_time_window_from_hours(h) for h in range(100))
+
+# Matches times like "2pm", "2:30pm", "14:00", "2 pm"
+TIME_REGEX = _re.compile(r"(?i)\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\b")
 
-# Matches ordinals like "6th", "3rd", "21st"
-_ORDINAL_RE = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)\b", re.IGNORECASE)
 
-# Matches "March 6", "6 March", "6 march", etc.
 _MONTH_NAMES = (
     r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|jun(?:e)?"
     r"|jul(?:y)?|aug(?:ust)?|sep(?:tember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
 )
-_MONTH_DATE_RE = re.compile(
-    rf"\b(?:{_MONTH_NAMES})\s+(\d{{1,2}})\b"          # "March 6"
-    rf"|\b(\d{{1,2}})\s+(?:{_MONTH_NAMES})\b",         # "6 March"
-    re.IGNORECASE,
+# Day-of-month mentions in one alternation, so the text is scanned once:
+# "March 6" (md), "6 March" (dm) or an ordinal like "6th", "3rd", "21st" (ord)
+_DATE_RE = _re.compile(
+    rf"(?i)\b(?:{_MONTH_NAMES})\s+(?P<md>\d{{1,2}})\b"
+    rf"|\b(?P<dm>\d{{1,2}})\s+(?:{_MONTH_NAMES})\b"
+    r"|\b(?P<ord>\d{1,2})(?:st|nd|rd|th)\b"
 )
 
 
-@dataclass
+# Frozen so route_from_text can hand the same cached instance to every caller.
+@dataclass(frozen=True, slots=True)
 class Signals:
     day: Optional[str] = None
     time_window: Optional[str] = None
@@ -76,51 +99,66 @@ class Signals:
     raw_text: str = ""
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RouteInfo:
     route: str
     confidence: float
     signals: Signals
 
 
-_NEGATION_RE = re.compile(
-    r"\b(can't|cannot|doesn't|don't|wont|won't|not|no|never|doesnt|"
-    r"doesn't work|can't do|won't work|wont work|doesn't suit|not available)\b",
-    re.IGNORECASE,
+_NEGATION_RE = _re.compile(
+    r"(?i)\b(can't|cannot|doesn't|don't|wont|won't|not|no|never|doesnt|"
+    r"doesn't work|can't do|won't work|wont work|doesn't suit|not available)\b"
 )
+# Chars either side of a day mention searched for a negation
+_NEGATION_WINDOW = 50
 
 
 def extract_signals(text: str) -> Signals:
     """Extract day, time_window, and explicit time from text."""
     t = (text or "").lower().strip()
-    signals = Signals(raw_text=text or "")
+    day: Optional[str] = None
+    time_window: Optional[str] = None
+    explicit_time: Optional[str] = None
+    explicit_date: Optional[int] = None
 
     # Extract day — collect all matches, skip negated ones
     # e.g. "Tuesday doesn't work, how about Friday?" → picks Friday, not Tuesday
     day_matches: list[tuple[str, int, int]] = []  # (day_name, start, end)
-    for pattern, day_name in DAY_PATTERNS.items():
-        for m in re.finditer(pattern, t, re.IGNORECASE):
-            day_matches.append((day_name, m.start(), m.end()))
+    for m in _DAY_RE.finditer(t):
+        day_matches.append((m.lastgroup, m.start(), m.end()))
 
+    # A day is negated when a whole negation lies within the 50 chars either side
+    # of it. Negations are found in one scan of the text; each window check is
+    # then a bisect over their sorted start offsets.
     affirmative: list[tuple[str, int]] = []
-    for day_name, start, end in day_matches:
-        window_before = t[max(0, start - 50): start]
-        window_after  = t[end: min(len(t), end + 50)]
-        if not _NEGATION_RE.search(window_before) and not _NEGATION_RE.search(window_after):
+    if day_matches:
+        neg_starts: list[int] = []
+        neg_ends: list[int] = []
+        for m in _NEGATION_RE.finditer(t):
+            neg_starts.append(m.start())
+            neg_ends.append(m.end())
+        n_neg = len(neg_ends)
+        for day_name, start, end in day_matches:
+            i = bisect_left(neg_starts, start - _NEGATION_WINDOW)
+            if i < n_neg and neg_ends[i] <= start:
+                continue
+            i = bisect_left(neg_starts, end)
+            if i < n_neg and neg_ends[i] <= end + _NEGATION_WINDOW:
+                continue
             affirmative.append((day_name, start))
 
     if affirmative:
         # Pick earliest affirmative day mention
-        signals.day = min(affirmative, key=lambda x: x[1])[0]
+        day = min(affirmative, key=lambda x: x[1])[0]
     elif day_matches:
         # All mentions are negated — pick the last one (probably what they're pivoting to)
-        signals.day = max(day_matches, key=lambda x: x[1])[0]
+        day = max(day_matches, key=lambda x: x[1])[0]
 
-    # Extract time window (explicit keywords first)
-    for pattern, window in TIME_WINDOW_PATTERNS.items():
-        if re.search(pattern, t):
-            signals.time_window = window
-            break
+    # Extract time window (explicit keywords first; earliest-listed window wins)
+    windows_seen = {m.lastgroup for m in _TIME_WINDOW_RE.finditer(t)}
+    if windows_seen:
+        time_window = next(w for w in _TIME_WINDOW_ORDER if w in windows_seen)
 
     # Extract explicit time
     time_match = TIME_REGEX.search(t)
@@ -128,39 +166,37 @@ def extract_signals(text: str) -> Signals:
         hour = time_match.group(1)
         minutes = time_match.group(2) or "00"
         ampm = (time_match.group(3) or "").lower()
-        signals.explicit_time = f"{hour}:{minutes}{ampm}".strip(":")
+        explicit_time = f"{hour}:{minutes}{ampm}".strip(":")
 
-    # If no explicit time window found, try to infer from numeric times
-    if signals.time_window is None and signals.explicit_time:
-        try:
-            hour_val = int(signals.explicit_time.split(":")[0])
-            signals.time_window = _infer_time_window_from_hours(hour_val)
-        except (ValueError, IndexError):
-            pass
+        # If no explicit time window found, infer it from the hour
+        if time_window is None:
+            time_window = _HOUR_TIME_WINDOWS[int(hour)]
 
     # Extract explicit date (day-of-month) from ordinals or "Month day" patterns
     # e.g. "Friday 6th" → explicit_date=6, "March 6" → explicit_date=6
-    month_m = _MONTH_DATE_RE.search(t)
-    if month_m:
-        # Group 1 = "Month D" form, group 2 = "D Month" form
-        day_str = month_m.group(1) or month_m.group(2)
-        try:
-            d = int(day_str)
-            if 1 <= d <= 31:
-                signals.explicit_date = d
-        except (ValueError, TypeError):
-            pass
-    else:
-        ord_m = _ORDINAL_RE.search(t)
-        if ord_m:
-            try:
-                d = int(ord_m.group(1))
-                if 1 <= d <= 31:
-                    signals.explicit_date = d
-            except (ValueError, TypeError):
-                pass
-
-    return signals
+    # A "Month day" form anywhere wins over ordinals; otherwise the first ordinal
+    month_day: Optional[str] = None
+    ordinal_day: Optional[str] = None
+    for m in _DATE_RE.finditer(t):
+        if m.lastgroup == "ord":
+            if ordinal_day is None:
+                ordinal_day = m.group("ord")
+        else:
+            month_day = m.group(m.lastgroup)
+            break
+    day_str = month_day if month_day is not None else ordinal_day
+    if day_str is not None:
+        d = int(day_str)
+        if 1 <= d <= 31:
+            explicit_date = d
+
+    return Signals(
+        day=day,
+        time_window=time_window,
+        explicit_time=explicit_time,
+        explicit_date=explicit_date,
+        raw_text=text or "",
+    )
 
 
 def route_from_signals(signals: Signals) -> RouteInfo:
@@ -187,12 +223,25 @@ def route_from_signals(signals: Signals) -> RouteInfo:
     )
 
 
+@lru_cache(maxsize=4096)
 def route_from_text(text: str) -> RouteInfo:
-    """Main entry: extract signals and determine route."""
+    """
+    Main entry: extract signals and determine route.
+
+    Cached per text: short replies ("yes", "1", "ok") dominate inbound traffic
+    and always route the same way.
+    """
     signals = extract_signals(text)
     return route_from_signals(signals)
 
 
+# How compose_reply echoes each normalized day back to the lead
+_DAY_DISPLAY = {
+    day: day if day in ("today", "tomorrow") else day.capitalize()
+    for day in DAY_PATTERNS.values()
+}
+
+
 def compose_reply(route_info: RouteInfo) -> str:
     """Compose a contextual, one-question reply based on route and signals."""
     signals = route_info.signals
@@ -201,7 +250,7 @@ def compose_reply(route_info: RouteInfo) -> str:
     # Build a reflection of what the user said
     parts = []
     if signals.day:
-        parts.append(signals.day.capitalize() if signals.day not in ("today", "tomorrow") else signals.day)
+        parts.append(_DAY_DISPLAY.get(signals.day, signals.day))
     if signals.time_window:
         parts.append(signals.time_window)
     if signals.explicit_time:
@@ -223,6 +272,19 @@ def compose_reply(route_info: RouteInfo) -> str:
     return "No problem — what day works for you, and would morning, afternoon, or evening be best?"
 
 
+# Prime the cache with the common short replies so even the first one per process
+# skips the regexes. Routed normally (not stubbed): "1"/"2" do carry an explicit
+# time and the stored route_info must match what the router would produce.
+for _reply in (
+    "yes", "Yes", "yes please", "Yes please", "yeah", "Yeah", "yep", "Yep",
+    "no", "No", "no thanks", "No thanks", "ok", "Ok", "OK", "okay", "Okay",
+    "sure", "Sure", "perfect", "Perfect", "great", "Great", "thanks", "Thanks",
+    "1", "2", "3",
+):
+    route_from_text(_reply)
+del _reply
+
+
 def route_info_to_dict(route_info: RouteInfo) -> dict[str, Any]:
     """Convert RouteInfo to a dict for storing in payload."""
     return {
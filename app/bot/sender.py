@@ -1,10 +1,14 @@
 from __future__ import annotations
+import asyncio
 from datetime import datetime, timedelta
 from typing import Any
+from zoneinfo import ZoneInfo
 import asyncpg
+import random
 import uuid
 
 from app.adapters.messaging import get_messaging_adapter
+from app.db import get_pool, prepared, register_prepared
 from app.bot.tenants import load_tenant, get_messaging_settings
 
 
@@ -16,19 +20,30 @@ from app.bot.tenants import load_tenant, get_messaging_settings
 
 # Retry configuration
 MAX_SEND_ATTEMPTS = 3
-# Backoff schedule in seconds: 30s, 2m, 10m
+# Backoff schedule in seconds: 30s, 2m, 10m (centre of the jittered delay)
 BACKOFF_SECONDS = [30, 120, 600]
+# Each delay is scaled by a random factor in [1 - j, 1 + j] so messages that
+# failed together (provider outage) don't all retry in the same tick
+BACKOFF_JITTER = 0.5
+# Tenants whose sends are in flight at once per batch (each tenant sends serially)
+SEND_CONCURRENCY = 16
 
+_LONDON = ZoneInfo("Europe/London")
 
-def _get_backoff_seconds(attempt: int) -> int:
-    """Get backoff delay in seconds for given attempt number (1-indexed)."""
+
+def _get_backoff_seconds(attempt: int) -> float:
+    """Get jittered backoff delay in seconds for given attempt number (1-indexed)."""
     idx = min(attempt - 1, len(BACKOFF_SECONDS) - 1)
-    return BACKOFF_SECONDS[idx] if idx >= 0 else BACKOFF_SECONDS[0]
+    base = BACKOFF_SECONDS[idx] if idx >= 0 else BACKOFF_SECONDS[0]
+    return base * random.uniform(1 - BACKOFF_JITTER, 1 + BACKOFF_JITTER)
 
 
-# Step 1: Atomically claim messages by setting send_status='sending'
-# Only claims messages where send_status='pending' AND (no send_next_at OR send_next_at <= now)
-CLAIM_PENDING_OUTBOUND_SQL = """
+# Atomically claim messages by setting send_status='sending' and return what the
+# sender needs in the same round trip. Only claims messages where
+# send_status='pending' AND (no send_next_at OR send_next_at <= now).
+# The outer SELECT reads the UPDATE's RETURNING rows (the post-claim versions, with
+# send_status='sending'); reading bot.messages again would see the pre-update snapshot.
+CLAIM_AND_FETCH_PENDING_OUTBOUND_SQL = """
 WITH candidates AS (
   SELECT message_id
   FROM bot.messages
@@ -41,31 +56,27 @@ WITH candidates AS (
   ORDER BY created_at ASC
   LIMIT $1
   FOR UPDATE SKIP LOCKED
+),
+claimed AS (
+  UPDATE bot.messages m
+  SET payload = m.payload || '{"send_status": "sending"}'::jsonb
+  FROM candidates c
+  WHERE m.message_id = c.message_id
+    AND m.payload->>'send_status' = 'pending'  -- Double-check for safety
+  RETURNING m.message_id, m.tenant_id, m.conversation_id, m.contact_id,
+            m.provider, m.channel, m.text, m.payload
 )
-UPDATE bot.messages m
-SET payload = m.payload || '{"send_status": "sending"}'::jsonb
-FROM candidates c
-WHERE m.message_id = c.message_id
-  AND m.payload->>'send_status' = 'pending'  -- Double-check for safety
-RETURNING m.message_id::text AS message_id;
-"""
-
-# Step 2: Fetch full data for claimed messages (now in 'sending' state)
-FETCH_SENDING_MESSAGES_SQL = """
-SELECT m.message_id::text AS message_id,
-       m.tenant_id::text AS tenant_id,
-       m.conversation_id::text AS conversation_id,
-       m.contact_id::text AS contact_id,
-       m.provider,
-       m.channel,
-       m.text,
-       m.payload,
+SELECT cl.message_id::text AS message_id,
+       cl.tenant_id::text AS tenant_id,
+       cl.conversation_id::text AS conversation_id,
+       cl.contact_id::text AS contact_id,
+       cl.provider,
+       cl.channel,
+       cl.text,
+       cl.payload,
        c.channel_address
-FROM bot.messages m
-JOIN bot.contacts c ON c.contact_id = m.contact_id
-WHERE m.message_id = ANY($1::uuid[])
-  AND m.direction = 'outbound'
-  AND m.payload->>'send_status' = 'sending';
+FROM claimed cl
+JOIN bot.contacts c ON c.contact_id = cl.contact_id;
 """
 
 MARK_OUTBOUND_SENT_SQL = """
@@ -84,10 +95,11 @@ WHERE message_id = $1::uuid
   AND payload->>'send_status' = 'sending';
 """
 
+# $1 = every conversation that had a message sent in this batch
 UPDATE_CONVERSATION_LAST_OUTBOUND_SQL = """
 UPDATE bot.conversations
 SET last_outbound_at = now(), updated_at = now()
-WHERE conversation_id = $1::uuid;
+WHERE conversation_id = ANY($1::uuid[]);
 """
 
 # $2 = new_status ('pending' for retry, 'failed' for max attempts reached)
@@ -109,6 +121,14 @@ WHERE message_id = $1::uuid
 """
 
 
+register_prepared(
+    CLAIM_AND_FETCH_PENDING_OUTBOUND_SQL,
+    MARK_OUTBOUND_SENT_SQL,
+    UPDATE_CONVERSATION_LAST_OUTBOUND_SQL,
+    MARK_OUTBOUND_FAILED_SQL,
+)
+
+
 async def send_pending_outbound(conn: asyncpg.Connection, limit: int) -> dict[str, Any]:
     """Claim and send pending outbound messages with retry/backoff and dry-run support.
 
@@ -117,36 +137,39 @@ async def send_pending_outbound(conn: asyncpg.Connection, limit: int) -> dict[st
     - Atomically transitions to 'sending' before processing
     - Guards all updates with send_status='sending' check
     """
-    from zoneinfo import ZoneInfo
-
-    tz = ZoneInfo("Europe/London")
+    tz = _LONDON
 
-    # Step 1: Atomically claim messages (pending -> sending)
-    claimed_rows = await conn.fetch(CLAIM_PENDING_OUTBOUND_SQL, limit)
-    if not claimed_rows:
+    # Atomically claim messages (pending -> sending) and fetch them in one query
+    rows = await (await prepared(conn, CLAIM_AND_FETCH_PENDING_OUTBOUND_SQL)).fetch(limit)
+    if not rows:
         return {"selected": 0, "sent": 0, "failed": 0, "skipped": 0, "dry_run_count": 0}
 
-    claimed_ids = [r["message_id"] for r in claimed_rows]
-
-    # Step 2: Fetch full data for claimed messages
-    rows = await conn.fetch(FETCH_SENDING_MESSAGES_SQL, claimed_ids)
-
     sent = 0
     failed = 0
     skipped = 0
     dry_run_count = 0
 
+    # Terminal writes are collected and issued once after the loop. The caller
+    # runs the whole batch in one transaction, so nothing commits earlier anyway.
+    sent_rows: list[tuple[Any, ...]] = []
+    failed_rows: list[tuple[Any, ...]] = []
+    sent_conversation_ids: set[str] = set()
+
     # Cache tenant settings to avoid repeated lookups
     tenant_cache: dict[str, dict[str, Any]] = {}
+    # The tenant row itself (or the error loading it), handed to the adapter factory
+    tenant_rows: dict[str, Any] = {}
+    # One adapter per tenant (or the tenant's load error). Adapters get the pool,
+    # not conn: their own DB reads then run on separate connections and the
+    # sends below can overlap without sharing this transaction's connection.
+    adapter_cache: dict[str, Any] = {}
+    live: list[tuple[asyncpg.Record, int, Any]] = []
 
     for r in rows:
         mid = r["message_id"]
         tenant_id = r["tenant_id"]
-        conversation_id = r["conversation_id"]
         payload = r["payload"] if isinstance(r["payload"], dict) else {}
         current_attempts = int(payload.get("send_attempts", 0) or 0)
-        now = datetime.now(tz)
-        attempted_at = now.isoformat()
 
         # Guard: skip if not in 'sending' state (already processed)
         if payload.get("send_status") != "sending":
@@ -157,109 +180,133 @@ async def send_pending_outbound(conn: asyncpg.Connection, limit: int) -> dict[st
         if tenant_id not in tenant_cache:
             try:
                 tenant = await load_tenant(conn, tenant_id)
+                tenant_rows[tenant_id] = tenant
                 tenant_cache[tenant_id] = get_messaging_settings(tenant)
-            except Exception:
+            except Exception as e:
+                tenant_rows[tenant_id] = e
                 tenant_cache[tenant_id] = {"dry_run": False, "provider": None}
 
-        messaging_settings = tenant_cache[tenant_id]
-        is_dry_run = messaging_settings.get("dry_run", False)
+        if tenant_cache[tenant_id].get("dry_run", False):
+            # DRY-RUN MODE: Skip external API, simulate success
+            attempted_at = datetime.now(tz).isoformat()
+            msg_id = f"dryrun-{uuid.uuid4().hex[:16]}"
+            provider_response = {
+                "dry_run": True,
+                "status": "sent",
+                "message_id": msg_id,
+            }
+            send_trace = {
+                "ok": True,
+                "dry_run": True,
+                "attempted_at": attempted_at,
+                "reason": None,
+            }
 
-        try:
-            if is_dry_run:
-                # DRY-RUN MODE: Skip external API, simulate success
-                msg_id = f"dryrun-{uuid.uuid4().hex[:16]}"
-                provider_response = {
-                    "dry_run": True,
-                    "status": "sent",
-                    "message_id": msg_id,
-                }
-                send_trace = {
-                    "ok": True,
-                    "dry_run": True,
-                    "attempted_at": attempted_at,
-                    "reason": None,
-                }
-
-                await conn.execute(
-                    MARK_OUTBOUND_SENT_SQL,
-                    mid,
-                    msg_id,
-                    attempted_at,
-                    provider_response,
-                    send_trace,
-                )
-                await conn.execute(UPDATE_CONVERSATION_LAST_OUTBOUND_SQL, conversation_id)
-                sent += 1
-                dry_run_count += 1
+            sent_rows.append((mid, msg_id, attempted_at, provider_response, send_trace))
+            sent_conversation_ids.add(r["conversation_id"])
+            sent += 1
+            dry_run_count += 1
+            continue
 
+        # LIVE MODE: resolve the messaging adapter now, send below
+        if tenant_id not in adapter_cache:
+            tenant = tenant_rows[tenant_id]
+            if isinstance(tenant, Exception):
+                adapter_cache[tenant_id] = tenant
             else:
-                # LIVE MODE: Call messaging adapter
-                msg_adapter = await get_messaging_adapter(conn, tenant_id)
-                result = await msg_adapter.send_message(
-                    channel=r["channel"],
-                    to_address=r["channel_address"],
-                    text=r["text"] or "",
-                    message_id=mid,
+                adapter_cache[tenant_id] = await get_messaging_adapter(
+                    await get_pool(), tenant_id, tenant=tenant
                 )
+        live.append((r, current_attempts, adapter_cache[tenant_id]))
+
+    # Provider calls are plain HTTP, so different tenants' sends run concurrently
+    # (bounded); every DB write stays in the serial section after them. Each
+    # tenant's messages go one at a time in claim (created_at) order: that keeps
+    # a contact's messages in sequence, and the GHL token refresh in
+    # get_valid_token isn't safe to run concurrently for one tenant.
+    semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+    outcomes: list[tuple[str, Any]] = [("", None)] * len(live)
+    live_by_tenant: dict[str, list[int]] = {}
+    for i, (r, _, _) in enumerate(live):
+        live_by_tenant.setdefault(r["tenant_id"], []).append(i)
+
+    async def _send_one(r: asyncpg.Record, msg_adapter: Any) -> tuple[str, Any]:
+        attempted_at = datetime.now(tz).isoformat()
+        try:
+            if isinstance(msg_adapter, Exception):
+                raise msg_adapter
+            result = await msg_adapter.send_message(
+                channel=r["channel"],
+                to_address=r["channel_address"],
+                text=r["text"] or "",
+                message_id=r["message_id"],
+            )
+        except Exception as e:
+            return attempted_at, e
+        return attempted_at, result
 
-                if result.get("success"):
-                    provider_msg_id = result.get("provider_msg_id", "")
-                    raw_response = result.get("raw_response", {})
-
-                    # Detect stub/dry-run: adapter stub OR tenant dry_run setting
-                    # "No real external send happened" = dry_run
-                    adapter_is_stub = raw_response.get("stub", False) is True
-                    effective_dry_run = adapter_is_stub or is_dry_run
-
-                    provider_response = {
-                        "dry_run": effective_dry_run,
-                        "status": "sent",
-                        "message_id": provider_msg_id,
-                        "raw": raw_response,
-                    }
-                    send_trace = {
-                        "ok": True,
-                        "dry_run": effective_dry_run,
-                        "attempted_at": attempted_at,
-                        "reason": None,
-                    }
-                    await conn.execute(
-                        MARK_OUTBOUND_SENT_SQL,
-                        mid,
-                        provider_msg_id,
-                        attempted_at,
-                        provider_response,
-                        send_trace,
-                    )
-                    await conn.execute(UPDATE_CONVERSATION_LAST_OUTBOUND_SQL, conversation_id)
-                    sent += 1
-                    if effective_dry_run:
-                        dry_run_count += 1
-                else:
-                    # Provider returned failure
-                    error_msg = result.get("error", "Unknown provider error")
-                    send_trace = {
-                        "ok": False,
-                        "dry_run": is_dry_run,
-                        "attempted_at": attempted_at,
-                        "reason": error_msg,
-                    }
-                    await _mark_failed_with_backoff(conn, mid, current_attempts, error_msg, tz, send_trace)
-                    failed += 1
+    async def _send_tenant(indices: list[int]) -> None:
+        async with semaphore:
+            for i in indices:
+                r, _, msg_adapter = live[i]
+                outcomes[i] = await _send_one(r, msg_adapter)
 
-        except Exception as e:
-            error_msg = str(e)
+    await asyncio.gather(*(_send_tenant(indices) for indices in live_by_tenant.values()))
+
+    for (r, current_attempts, _), (attempted_at, result) in zip(live, outcomes):
+        mid = r["message_id"]
+
+        if isinstance(result, Exception):
+            error_msg = str(result)
+        elif result.get("success"):
+            provider_msg_id = result.get("provider_msg_id", "")
+            raw_response = result.get("raw_response", {})
+
+            # Detect stub: tenant dry_run rows never reach here, but an adapter
+            # stub means no real external send happened either = dry_run
+            effective_dry_run = raw_response.get("stub", False) is True
+
+            provider_response = {
+                "dry_run": effective_dry_run,
+                "status": "sent",
+                "message_id": provider_msg_id,
+                "raw": raw_response,
+            }
             send_trace = {
-                "ok": False,
-                "dry_run": is_dry_run,
+                "ok": True,
+                "dry_run": effective_dry_run,
                 "attempted_at": attempted_at,
-                "reason": error_msg,
+                "reason": None,
             }
-            await _mark_failed_with_backoff(conn, mid, current_attempts, error_msg, tz, send_trace)
-            failed += 1
+            sent_rows.append((mid, provider_msg_id, attempted_at, provider_response, send_trace))
+            sent_conversation_ids.add(r["conversation_id"])
+            sent += 1
+            if effective_dry_run:
+                dry_run_count += 1
+            continue
+        else:
+            # Provider returned failure
+            error_msg = result.get("error", "Unknown provider error")
+
+        send_trace = {
+            "ok": False,
+            "dry_run": False,
+            "attempted_at": attempted_at,
+            "reason": error_msg,
+        }
+        failed_rows.append(_failed_row(mid, current_attempts, error_msg, tz, send_trace))
+        failed += 1
+
+    if sent_rows:
+        await (await prepared(conn, MARK_OUTBOUND_SENT_SQL)).executemany(sent_rows)
+        await (await prepared(conn, UPDATE_CONVERSATION_LAST_OUTBOUND_SQL)).fetchval(
+            list(sent_conversation_ids)
+        )
+    if failed_rows:
+        await (await prepared(conn, MARK_OUTBOUND_FAILED_SQL)).executemany(failed_rows)
 
     return {
-        "selected": len(claimed_ids),
+        "selected": len(rows),
         "sent": sent,
         "failed": failed,
         "skipped": skipped,
@@ -267,21 +314,19 @@ async def send_pending_outbound(conn: asyncpg.Connection, limit: int) -> dict[st
     }
 
 
-async def _mark_failed_with_backoff(
-    conn: asyncpg.Connection,
+def _failed_row(
     message_id: str,
     current_attempts: int,
     error_msg: str,
     tz: Any,
     send_trace: dict[str, Any],
-) -> None:
-    """Mark message for retry (pending) or permanently failed after max attempts."""
+) -> tuple[Any, ...]:
+    """MARK_OUTBOUND_FAILED_SQL args: retry (pending) or permanently failed after max attempts."""
     new_attempts = current_attempts + 1
 
     if new_attempts >= MAX_SEND_ATTEMPTS:
         # Max attempts reached - mark as failed (no more retries)
-        await conn.execute(
-            MARK_OUTBOUND_FAILED_SQL,
+        return (
             message_id,
             "failed",
             new_attempts,
@@ -289,16 +334,15 @@ async def _mark_failed_with_backoff(
             error_msg,
             send_trace,
         )
-    else:
-        # Schedule retry: back to 'pending' with send_next_at for backoff
-        backoff_secs = _get_backoff_seconds(new_attempts)
-        next_at = datetime.now(tz) + timedelta(seconds=backoff_secs)
-        await conn.execute(
-            MARK_OUTBOUND_FAILED_SQL,
-            message_id,
-            "pending",
-            new_attempts,
-            next_at.isoformat(),
-            error_msg,
-            send_trace,
-        )
+
+    # Schedule retry: back to 'pending' with send_next_at for backoff
+    backoff_secs = _get_backoff_seconds(new_attempts)
+    next_at = datetime.now(tz) + timedelta(seconds=backoff_secs)
+    return (
+        message_id,
+        "pending",
+        new_attempts,
+        next_at.isoformat(),
+        error_msg,
+        send_trace,
+    )
@@ -1,11 +1,17 @@
 from __future__ import annotations
 from typing import Any, Optional
+import asyncio
 import asyncpg
-import json
+import logging
+import orjson
 import os
+import time
+import weakref
 
+from app.db import prepared, register_prepared
 from app.utils.crypto import decrypt_credentials
 
+logger = logging.getLogger(__name__)
 
 LOAD_TENANT_SETTINGS_SQL = """
 SELECT tenant_id::text, tenant_slug, calendar_adapter, messaging_adapter, settings
@@ -26,10 +32,43 @@ FROM core.tenant_credentials
 WHERE tenant_id = $1::uuid;
 """
 
+register_prepared(LOAD_TENANT_SETTINGS_SQL, LOAD_TENANT_CREDENTIALS_SQL)
+
+
+# In-process cache of load_tenant results: tenant_id -> (expires_at, tenant).
+# Tenant settings change rarely and are written by out-of-process scripts, so a
+# short TTL is accepted as eventual consistency (the README states the window).
+# Credentials are deliberately not cached (OAuth refreshes rewrite them).
+_TENANT_CACHE_TTL_SECONDS = 60.0
+_TENANT_CACHE_MAX = 256
+_tenant_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+_tenant_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
 
 async def load_tenant(conn: asyncpg.Connection, tenant_id: str) -> dict[str, Any]:
-    """Load tenant settings from core.tenants."""
-    row = await conn.fetchrow(LOAD_TENANT_SETTINGS_SQL, tenant_id)
+    """Load tenant settings from core.tenants (cached in-process for up to 60s)."""
+    cached = _tenant_cache.get(tenant_id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    # Single-flight: concurrent misses for one tenant wait for the first load
+    lock = _tenant_locks.get(tenant_id)
+    if lock is None:
+        lock = _tenant_locks[tenant_id] = asyncio.Lock()
+    async with lock:
+        cached = _tenant_cache.get(tenant_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        tenant = await _load_tenant_uncached(conn, tenant_id)
+        if len(_tenant_cache) >= _TENANT_CACHE_MAX and tenant_id not in _tenant_cache:
+            _tenant_cache.pop(next(iter(_tenant_cache)))
+        _tenant_cache[tenant_id] = (time.monotonic() + _TENANT_CACHE_TTL_SECONDS, tenant)
+        return tenant
+
+
+async def _load_tenant_uncached(conn: asyncpg.Connection, tenant_id: str) -> dict[str, Any]:
+    row = await (await prepared(conn, LOAD_TENANT_SETTINGS_SQL)).fetchrow(tenant_id)
     if not row:
         raise RuntimeError(f"Tenant not found or disabled: {tenant_id}")
 
@@ -39,8 +78,8 @@ async def load_tenant(conn: asyncpg.Connection, tenant_id: str) -> dict[str, Any
         settings = raw_settings
     elif isinstance(raw_settings, str):
         try:
-            settings = json.loads(raw_settings)
-        except json.JSONDecodeError:
+            settings = orjson.loads(raw_settings)
+        except orjson.JSONDecodeError:
             settings = {}
     else:
         settings = {}
@@ -66,8 +105,8 @@ async def load_tenant_debug(conn: asyncpg.Connection, tenant_id: str) -> dict[st
         settings = raw_settings
     elif isinstance(raw_settings, str):
         try:
-            settings = json.loads(raw_settings)
-        except json.JSONDecodeError:
+            settings = orjson.loads(raw_settings)
+        except orjson.JSONDecodeError:
             settings = {}
     else:
         settings = {}
@@ -103,7 +142,7 @@ async def load_tenant_credentials(
 
     Falls back to global env vars if no credentials found in DB (migration path).
     """
-    rows = await conn.fetch(LOAD_TENANT_CREDENTIALS_SQL, tenant_id)
+    rows = await (await prepared(conn, LOAD_TENANT_CREDENTIALS_SQL)).fetch(tenant_id)
 
     credentials: dict[str, dict[str, Any]] = {}
 
@@ -119,7 +158,10 @@ async def load_tenant_credentials(
                 credentials[row_provider] = decrypted
             except Exception as e:
                 # Log but don't fail - allows fallback to env vars
-                print(f"WARN: Failed to decrypt credentials for tenant={tenant_id} provider={row_provider}: {e}")
+                logger.warning(
+                    "Failed to decrypt credentials for tenant=%s provider=%s: %s",
+                    tenant_id, row_provider, e,
+                )
 
     # Fallback to global env vars if no DB credentials found (migration path)
     if not credentials.get("ghl"):
@@ -6,15 +6,63 @@ All fields are flat and queryable.
 """
 from __future__ import annotations
 
+import atexit
 import json
 import logging
+import logging.handlers
+import queue
 import sys
+import time
 from datetime import datetime
 from typing import Any, Optional
 
+logger = logging.getLogger(__name__)
+
 # Dedicated logger for trace events (separate from operational logs)
 _trace_logger: Optional[logging.Logger] = None
 
+# Trace records are handed to a listener thread that formats and writes them, so
+# the event loop never blocks on stdout. Bounded: under overload records are
+# dropped rather than queued without limit, and the drops are reported on the
+# operational logger at most once a minute (and once more at exit).
+_TRACE_QUEUE_MAX = 10_000
+_DROP_REPORT_INTERVAL_SECONDS = 60.0
+_trace_dropped = 0
+_trace_dropped_reported = 0
+_trace_drop_reported_at = float("-inf")
+
+
+def _report_trace_drops(force: bool = False) -> None:
+    """Warn about trace records dropped since the last report (rate-limited)."""
+    global _trace_dropped_reported, _trace_drop_reported_at
+    pending = _trace_dropped - _trace_dropped_reported
+    if pending <= 0:
+        return
+    now = time.monotonic()
+    if not force and now - _trace_drop_reported_at < _DROP_REPORT_INTERVAL_SECONDS:
+        return
+    _trace_drop_reported_at = now
+    _trace_dropped_reported = _trace_dropped
+    logger.warning(
+        "Trace queue full: dropped %d trace records (%d since start)", pending, _trace_dropped
+    )
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that passes records through untouched and drops them when full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep record.msg as the dict; JsonFormatter runs on the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _trace_dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _trace_dropped += 1
+            _report_trace_drops()
+
 
 def _get_trace_logger() -> logging.Logger:
     """Get or create the trace logger with JSON formatting."""
@@ -39,7 +87,17 @@ def _get_trace_logger() -> logging.Logger:
             return super().format(record)
 
     handler.setFormatter(JsonFormatter())
-    _trace_logger.addHandler(handler)
+
+    trace_queue: queue.Queue = queue.Queue(maxsize=_TRACE_QUEUE_MAX)
+    listener = logging.handlers.QueueListener(trace_queue, handler, respect_handler_level=True)
+    listener.start()
+
+    def _stop_listener() -> None:
+        listener.stop()
+        _report_trace_drops(force=True)
+
+    atexit.register(_stop_listener)
+    _trace_logger.addHandler(_DroppingQueueHandler(trace_queue))
 
     return _trace_logger
 
@@ -10,6 +10,8 @@ class Settings:
     service_name: str = os.getenv("SERVICE_NAME", "humtech-worker")
     worker_id: str = os.getenv("WORKER_ID", "worker-1")
     database_url: str = os.getenv("DATABASE_URL", "")
+    db_pool_min_size: int = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    db_pool_max_size: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
 
     # Outreach pipeline
     apollo_api_key: str = os.getenv("APOLLO_API_KEY", "")
@@ -1,18 +1,57 @@
 import asyncpg
-import json
+import logging
+import orjson
+import weakref
+from asyncpg.prepared_stmt import PreparedStatement
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 _pool: asyncpg.Pool | None = None
 
+# Hot-path statements prepared explicitly, per physical connection. Keyed weakly
+# so entries go away with the connection when the pool recycles it.
+_prepared: "weakref.WeakKeyDictionary[asyncpg.Connection, dict[str, PreparedStatement]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# SQL prepared on every new pool connection (see register_prepared)
+_warm_statements: list[str] = []
+
+
+def register_prepared(*sqls: str) -> None:
+    """Register hot-path SQL to be prepared when each pool connection opens."""
+    for sql in sqls:
+        if sql not in _warm_statements:
+            _warm_statements.append(sql)
+
+
+def _encode_jsonb(value) -> bytes:
+    # jsonb binary wire format: version byte (1) followed by the JSON text.
+    # OPT_NON_STR_KEYS keeps json.dumps' behaviour of stringifying int keys.
+    return b"\x01" + orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _decode_jsonb(data: bytes):
+    return orjson.loads(data[1:])
+
 
 async def _init_connection(conn: asyncpg.Connection) -> None:
-    """Initialize connection with JSON codec for JSONB columns."""
+    """Initialize connection with JSON codec for JSONB columns and warm prepared statements."""
     await conn.set_type_codec(
         "jsonb",
-        encoder=json.dumps,
-        decoder=json.loads,
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
         schema="pg_catalog",
+        format="binary",
     )
+    # Warm the prepared-statement cache so the first job on this connection
+    # doesn't pay Parse/Describe; a failure here must not take the pool down.
+    for sql in _warm_statements:
+        try:
+            await prepared(conn, sql)
+        except Exception:
+            logger.warning("Failed to prepare statement on connect", exc_info=True)
 
 
 async def init_db_pool() -> asyncpg.Pool:
@@ -22,9 +61,13 @@ async def init_db_pool() -> asyncpg.Pool:
             raise RuntimeError("DATABASE_URL is not set")
         _pool = await asyncpg.create_pool(
             dsn=settings.database_url,
-            min_size=1,
-            max_size=10,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+            max_queries=50_000,
+            max_inactive_connection_lifetime=300,
             command_timeout=30,
+            statement_cache_size=1024,
+            max_cached_statement_lifetime=0,
             init=_init_connection,
         )
     return _pool
@@ -39,3 +82,24 @@ async def get_pool() -> asyncpg.Pool:
     if _pool is None:
         return await init_db_pool()
     return _pool
+
+
+async def prepared(conn: asyncpg.Connection, sql: str) -> PreparedStatement:
+    """
+    Return a prepared statement for sql on this connection, preparing it once.
+
+    Accepts a pool proxy or a raw connection; the cache lives on the raw
+    connection so it survives acquire/release cycles.
+
+    A statement that hit OutdatedSchemaCacheError (e.g. after an ALTER TABLE) is
+    closed by asyncpg and would raise InterfaceError on every later call, so a
+    closed entry is dropped and prepared again.
+    """
+    raw = getattr(conn, "_con", None) or conn
+    stmts = _prepared.get(raw)
+    if stmts is None:
+        stmts = _prepared[raw] = {}
+    stmt = stmts.get(sql)
+    if stmt is None or stmt._state.closed:
+        stmt = stmts[sql] = await conn.prepare(sql)
+    return stmt
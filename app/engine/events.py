@@ -138,6 +138,62 @@ WHERE tenant_id = $1::uuid
 LIMIT 1;
 """
 
+# ---------------------------------------------------------------------------
+# SQL — Resolve lead + record event in one statement
+# ---------------------------------------------------------------------------
+
+# Same resolution as resolve_or_create_lead (open lead by contact, else a new
+# 'bot' lead) followed by INSERT_LEAD_EVENT_SQL, in a single round trip.
+RESOLVE_LEAD_AND_INSERT_EVENT_SQL = """
+WITH existing AS (
+    SELECT lead_id
+    FROM engine.leads
+    WHERE tenant_id = $1::uuid
+      AND contact_provider = $2::text
+      AND contact_external_id = $3::text
+      AND is_open = TRUE
+    ORDER BY created_at DESC
+    LIMIT 1
+),
+created AS (
+    INSERT INTO engine.leads (
+        tenant_id, provider, external_id,
+        contact_provider, contact_external_id,
+        name, pipeline_name, current_stage, raw_stage,
+        source, lead_value, currency, metadata
+    )
+    SELECT
+        $1::uuid, 'bot', $4::text,
+        $2::text, $3::text,
+        NULL, NULL, 'lead_created', NULL,
+        $5::text, NULL, NULL, '{}'::jsonb
+    WHERE NOT EXISTS (SELECT 1 FROM existing)
+    RETURNING lead_id
+),
+lead AS (
+    SELECT lead_id FROM existing
+    UNION ALL
+    SELECT lead_id FROM created
+)
+INSERT INTO engine.lead_events (
+    tenant_id, lead_id,
+    event_type, canonical_stage,
+    source, source_event_id, actor,
+    payload, occurred_at
+)
+SELECT
+    $1::uuid, lead.lead_id,
+    $6::text, $7::text,
+    $8::text, $9::text, $10::text,
+    COALESCE($11::jsonb, '{}'::jsonb), $12::timestamptz
+FROM lead
+ON CONFLICT (tenant_id, lead_id, source, source_event_id) DO NOTHING
+RETURNING event_id::text;
+"""
+
+# Event types whose side effects write_lead_event applies after the insert
+_LIFECYCLE_EVENT_TYPES = frozenset({"stage_changed", "lead_won", "lead_lost", "value_changed"})
+
 # ---------------------------------------------------------------------------
 # Public functions
 # ---------------------------------------------------------------------------
@@ -341,3 +397,46 @@ async def write_lead_event(
         await conn.execute(UPDATE_LEAD_VALUE_SQL, lead_id, amount, currency)
 
     return event_id
+
+
+async def write_contact_event(
+    conn: asyncpg.Connection,
+    *,
+    tenant_id: str,
+    contact_provider: str,
+    contact_external_id: str,
+    lead_source: Optional[str],
+    event_type: str,
+    source: str,
+    occurred_at: datetime,
+    canonical_stage: Optional[str] = None,
+    source_event_id: Optional[str] = None,
+    actor: Optional[str] = None,
+    payload: Optional[dict[str, Any]] = None,
+) -> Optional[str]:
+    """
+    resolve_or_create_lead + write_lead_event in one round trip.
+
+    Only for event types without lead side effects (e.g. appointment_booked);
+    lifecycle events must go through write_lead_event.
+
+    Returns the new event_id, or None if the event already existed.
+    """
+    if event_type in _LIFECYCLE_EVENT_TYPES:
+        raise ValueError(f"write_contact_event does not apply side effects for {event_type!r}")
+
+    return await conn.fetchval(
+        RESOLVE_LEAD_AND_INSERT_EVENT_SQL,
+        tenant_id,
+        contact_provider,
+        contact_external_id,
+        f"bot-{uuid4().hex}",
+        lead_source,
+        event_type,
+        canonical_stage,
+        source,
+        source_event_id or f"{source}-{uuid4().hex}",
+        actor,
+        payload,
+        occurred_at,
+    )
@@ -21,6 +21,7 @@ from .db import init_db_pool, close_db_pool, get_pool
 from .bot.jobs import claim_jobs, mark_done, mark_retry
 from .bot.processor import process_job, process_reengage_job
 from .bot.sender import send_pending_outbound
+from .bot.llm import close_llm_client
 from .bot.tenants import load_tenant_debug
 from .engine.webhooks import router as engine_webhooks_router
 from .financial.routes import router as financial_router
@@ -127,6 +128,7 @@ async def _startup():
 
 @app.on_event("shutdown")
 async def _shutdown():
+    await close_llm_client()
     await close_db_pool()
 
 @app.get("/", include_in_schema=False)
@@ -12,7 +12,9 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import logging.handlers
 import os
+import queue
 import random
 import signal
 import sys
@@ -24,6 +26,7 @@ from app.db import init_db_pool, close_db_pool, get_pool
 from app.bot.jobs import claim_jobs, mark_done, mark_retry
 from app.bot.processor import process_job, process_reengage_job
 from app.bot.sender import send_pending_outbound
+from app.bot.llm import close_llm_client
 from app.agents.briefing import run as run_morning_briefing
 from app.agents.slack import SlackReporter
 from app.bot.reengage import check_reengagement
@@ -37,6 +40,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _start_log_listener() -> logging.handlers.QueueListener:
+    """
+    Move log formatting and stdout writes off the event loop.
+
+    The root logger's handlers are handed to a QueueListener thread; the loop
+    only enqueues records.
+    """
+    root = logging.getLogger()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
 # Config from env (milliseconds)
 WORKER_POLL_MIN_MS = int(os.getenv("WORKER_POLL_MIN_MS", "500"))
 WORKER_POLL_MAX_MS = int(os.getenv("WORKER_POLL_MAX_MS", "2000"))
@@ -288,6 +306,7 @@ async def main() -> None:
     """Main entry point: start all loops and handle shutdown."""
     global _shutdown_event
     _shutdown_event = asyncio.Event()
+    log_listener = _start_log_listener()
 
     # Register signal handlers
     signal.signal(signal.SIGINT, _handle_shutdown)
@@ -309,9 +328,11 @@ async def main() -> None:
             token_refresh_loop(),
         )
     finally:
+        await close_llm_client()
         logger.info("Closing database pool...")
         await close_db_pool()
         logger.info("Worker runner stopped")
+        log_listener.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+"""
+Tests for the per-connection prepared-statement cache in app.db.
+
+Verifies: one prepare per (connection, SQL), pool proxies share the raw
+connection's cache, and a statement asyncpg has closed is prepared again.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.db import prepared
+
+
+class FakeStatement:
+    def __init__(self, sql):
+        self.sql = sql
+        self._state = SimpleNamespace(closed=False)
+
+
+class FakeConn:
+    def __init__(self):
+        self.prepare_calls = 0
+
+    async def prepare(self, sql):
+        self.prepare_calls += 1
+        return FakeStatement(sql)
+
+
+class FakeProxy:
+    """Stands in for asyncpg's PoolConnectionProxy (raw connection on _con)."""
+
+    def __init__(self, con):
+        self._con = con
+
+    async def prepare(self, sql):
+        return await self._con.prepare(sql)
+
+
+class TestPrepared:
+    def test_prepares_once_per_connection(self):
+        conn = FakeConn()
+
+        async def run():
+            first = await prepared(conn, "SELECT 1")
+            second = await prepared(conn, "SELECT 1")
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first is second
+        assert conn.prepare_calls == 1
+
+    def test_proxy_shares_raw_connection_cache(self):
+        conn = FakeConn()
+
+        async def run():
+            direct = await prepared(conn, "SELECT 1")
+            via_proxy = await prepared(FakeProxy(conn), "SELECT 1")
+            return direct, via_proxy
+
+        direct, via_proxy = asyncio.run(run())
+        assert direct is via_proxy
+        assert conn.prepare_calls == 1
+
+    def test_closed_statement_is_prepared_again(self):
+        # asyncpg closes a statement after OutdatedSchemaCacheError
+        conn = FakeConn()
+
+        async def run():
+            stale = await prepared(conn, "SELECT 1")
+            stale._state.closed = True
+            fresh = await prepared(conn, "SELECT 1")
+            again = await prepared(conn, "SELECT 1")
+            return stale, fresh, again
+
+        stale, fresh, again = asyncio.run(run())
+        assert fresh is not stale
+        assert again is fresh
+        assert conn.prepare_calls == 2
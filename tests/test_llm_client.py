@@ -0,0 +1,270 @@
+"""
+Tests for the LLM HTTP layer in app.bot.llm.
+
+Verifies: the TPM token bucket (disabled at 0, refill-wait when empty) and
+_post_with_retry (retryable statuses, Retry-After handling, transport errors,
+final-attempt behaviour), and the confirmation-intent cache (key normalisation,
+LRU eviction, hits skipping the LLM). Time, sleeps and the LLM call are faked;
+no network is used.
+"""
+
+import asyncio
+from collections import OrderedDict
+
+import httpx
+import pytest
+
+import app.bot.llm as llm
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(llm.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+class FakeClient:
+    """Returns (or raises) the scripted outcomes in order, recording each call."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def post(self, url, headers=None, json=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _post(monkeypatch, outcomes, bucket=None):
+    client = FakeClient(outcomes)
+    monkeypatch.setattr(llm, "_get_client", lambda: client)
+    resp = asyncio.run(llm._post_with_retry(
+        "https://example.invalid/v1",
+        {},
+        {"model": "test-model"},
+        5.0,
+        asyncio.Semaphore(1),
+        bucket or llm._TokenBucket(0),
+        100,
+    ))
+    return resp, client
+
+
+# ---------------------------------------------------------------------------
+# _TokenBucket
+# ---------------------------------------------------------------------------
+
+class TestTokenBucket:
+    def test_zero_tpm_never_waits(self, clock):
+        bucket = llm._TokenBucket(0)
+        asyncio.run(bucket.acquire(10_000))
+        assert clock.sleeps == []
+
+    def test_within_budget_does_not_wait(self, clock):
+        bucket = llm._TokenBucket(600)
+        asyncio.run(bucket.acquire(600))
+        assert clock.sleeps == []
+        assert bucket.tokens == 0
+
+    def test_waits_for_refill_when_empty(self, clock):
+        bucket = llm._TokenBucket(600)  # refills at 10 tokens/s
+
+        async def run():
+            await bucket.acquire(600)
+            await bucket.acquire(50)
+
+        asyncio.run(run())
+        assert clock.sleeps == [pytest.approx(5.0)]
+
+    def test_oversized_request_is_capped_at_capacity(self, clock):
+        bucket = llm._TokenBucket(60)
+        asyncio.run(bucket.acquire(1_000_000))
+        assert clock.sleeps == []
+        assert bucket.tokens == 0
+
+
+# ---------------------------------------------------------------------------
+# _post_with_retry
+# ---------------------------------------------------------------------------
+
+class TestPostWithRetry:
+    def test_success_is_returned_without_retry(self, clock, monkeypatch):
+        resp, client = _post(monkeypatch, [httpx.Response(200)])
+        assert resp.status_code == 200
+        assert client.calls == 1
+        assert clock.sleeps == []
+
+    def test_non_retryable_status_is_returned_immediately(self, clock, monkeypatch):
+        resp, client = _post(monkeypatch, [httpx.Response(400)])
+        assert resp.status_code == 400
+        assert client.calls == 1
+
+    def test_429_honours_retry_after(self, clock, monkeypatch):
+        resp, client = _post(monkeypatch, [
+            httpx.Response(429, headers={"retry-after": "2"}),
+            httpx.Response(200),
+        ])
+        assert resp.status_code == 200
+        assert client.calls == 2
+        assert clock.sleeps == [2.0]
+
+    def test_retry_after_is_capped(self, clock, monkeypatch):
+        _post(monkeypatch, [
+            httpx.Response(503, headers={"retry-after": "3600"}),
+            httpx.Response(200),
+        ])
+        assert clock.sleeps == [llm._RETRY_MAX_DELAY_SECONDS]
+
+    def test_unparseable_retry_after_falls_back_to_backoff(self, clock, monkeypatch):
+        _post(monkeypatch, [
+            httpx.Response(529, headers={"retry-after": "soon"}),
+            httpx.Response(200),
+        ])
+        (delay,) = clock.sleeps
+        assert llm._RETRY_BASE_DELAY_SECONDS <= delay <= llm._RETRY_BASE_DELAY_SECONDS + 0.25
+
+    def test_last_retryable_response_is_returned(self, clock, monkeypatch):
+        outcomes = [httpx.Response(500) for _ in range(llm._RETRY_MAX_ATTEMPTS)]
+        resp, client = _post(monkeypatch, outcomes)
+        assert resp.status_code == 500
+        assert client.calls == llm._RETRY_MAX_ATTEMPTS
+        assert len(clock.sleeps) == llm._RETRY_MAX_ATTEMPTS - 1
+
+    def test_transport_error_is_retried(self, clock, monkeypatch):
+        resp, client = _post(monkeypatch, [httpx.ConnectError("reset"), httpx.Response(200)])
+        assert resp.status_code == 200
+        assert client.calls == 2
+
+    def test_transport_error_on_last_attempt_is_raised(self, clock, monkeypatch):
+        outcomes = [httpx.ReadTimeout("slow") for _ in range(llm._RETRY_MAX_ATTEMPTS)]
+        with pytest.raises(httpx.ReadTimeout):
+            _post(monkeypatch, outcomes)
+
+    def test_each_attempt_draws_from_the_bucket(self, clock, monkeypatch):
+        bucket = llm._TokenBucket(6000)
+        _post(monkeypatch, [httpx.Response(502), httpx.Response(200)], bucket=bucket)
+        # Two attempts at 100 estimated tokens each, plus refill during the backoff sleep
+        refilled = clock.sleeps[0] * bucket.rate
+        assert bucket.tokens == pytest.approx(6000 - 100 - 100 + refilled)
+
+
+# ---------------------------------------------------------------------------
+# Confirmation-intent cache
+# ---------------------------------------------------------------------------
+
+LLM_SETTINGS = {"model": "gpt-test", "enabled": True}
+
+
+@pytest.fixture
+def confirm_cache(monkeypatch):
+    """A private copy of the primed cache, plus a scripted _call_llm."""
+    cache = OrderedDict(llm._CONFIRM_CACHE)
+    monkeypatch.setattr(llm, "_CONFIRM_CACHE", cache)
+    calls = []
+    replies = []
+
+    async def fake_call_llm(**kwargs):
+        calls.append(kwargs)
+        return replies.pop(0)
+
+    monkeypatch.setattr(llm, "_call_llm", fake_call_llm)
+    return cache, calls, replies
+
+
+def _classify(text, settings=LLM_SETTINGS):
+    return asyncio.run(llm.classify_confirmation_intent_llm(text, settings))
+
+
+class TestConfirmCacheKey:
+    @pytest.mark.parametrize("text", ["Yes!", "yes.", "YES", "  yes  ", "y.e.s"])
+    def test_case_and_punctuation_are_folded(self, text):
+        assert llm._confirm_cache_key(text) == "yes"
+
+    def test_inner_whitespace_is_kept(self):
+        assert llm._confirm_cache_key("Sounds good!") == "sounds good"
+
+    def test_key_is_truncated(self):
+        key = llm._confirm_cache_key("a" * 500)
+        assert len(key) == llm._CONFIRM_CACHE_KEY_LEN
+
+    def test_non_ascii_letters_are_untouched(self):
+        assert llm._confirm_cache_key("Ja, BITTE") == "ja bitte"
+        assert llm._confirm_cache_key("Ñ") == "Ñ"
+
+
+class TestConfirmCacheEviction:
+    def test_oldest_entry_is_evicted(self, confirm_cache, monkeypatch):
+        cache, _, _ = confirm_cache
+        cache.clear()
+        monkeypatch.setattr(llm, "_CONFIRM_CACHE_MAX", 2)
+
+        llm._confirm_cache_put("a", True)
+        llm._confirm_cache_put("b", False)
+        llm._confirm_cache_put("c", True)
+        assert list(cache) == ["b", "c"]
+
+    def test_hit_refreshes_recency(self, confirm_cache, monkeypatch):
+        cache, _, replies = confirm_cache
+        cache.clear()
+        monkeypatch.setattr(llm, "_CONFIRM_CACHE_MAX", 2)
+        llm._confirm_cache_put("a", True)
+        llm._confirm_cache_put("b", False)
+
+        _classify("A")  # touches "a", so "b" is now the oldest
+        replies.append("yes")
+        _classify("c")
+        assert list(cache) == ["a", "c"]
+
+
+class TestClassifyConfirmationIntent:
+    def test_primed_reply_skips_the_llm(self, confirm_cache):
+        _, calls, _ = confirm_cache
+        result = _classify("Yes please!")
+        assert result == {"has_confirmation": True, "used": False, "error": None}
+        assert calls == []
+
+    def test_llm_verdict_is_cached(self, confirm_cache):
+        cache, calls, replies = confirm_cache
+        replies.append("Yes.")
+
+        first = _classify("That works for me")
+        second = _classify("that works for me!")
+
+        assert first == {"has_confirmation": True, "used": True, "error": None}
+        assert second == {"has_confirmation": True, "used": False, "error": None}
+        assert len(calls) == 1
+        assert cache["that works for me"] is True
+
+    def test_unexpected_response_is_not_cached(self, confirm_cache):
+        cache, calls, replies = confirm_cache
+        replies.extend(["perhaps", "no"])
+
+        first = _classify("hmm let me think")
+        second = _classify("hmm let me think")
+
+        assert first["error"] == "unexpected_response:perhaps"
+        assert second["has_confirmation"] is False
+        assert len(calls) == 2
+
+    def test_disabled_llm_ignores_the_cache(self, confirm_cache):
+        result = _classify("yes", {"model": "gpt-test", "enabled": False})
+        assert result["error"] == "llm_disabled"
+        assert result["has_confirmation"] is None
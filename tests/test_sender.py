@@ -0,0 +1,234 @@
+"""
+Tests for the outbound sender (app.bot.sender).
+
+Verifies: per-tenant send ordering, the cross-tenant concurrency bound,
+batched terminal writes, failed tenant loads, and retry backoff bounds.
+DB access goes through a fake prepared() that records executemany batches.
+"""
+
+import asyncio
+
+import pytest
+
+import app.bot.sender as sender
+
+
+# ---------------------------------------------------------------------------
+# Fakes
+# ---------------------------------------------------------------------------
+
+class FakeStatement:
+    def __init__(self, db, sql):
+        self.db = db
+        self.sql = sql
+
+    async def fetch(self, *args):
+        return self.db.rows
+
+    async def fetchval(self, *args):
+        self.db.fetchvals.append((self.sql, args))
+
+    async def executemany(self, rows):
+        self.db.batches.append((self.sql, list(rows)))
+
+
+class FakeDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.batches = []
+        self.fetchvals = []
+
+    def batch(self, sql):
+        return [rows for s, rows in self.batches if s == sql]
+
+
+class FakeAdapter:
+    def __init__(self, tenant_id, log, gauge, fail_texts=()):
+        self.tenant_id = tenant_id
+        self.log = log
+        self.gauge = gauge
+        self.fail_texts = fail_texts
+
+    async def send_message(self, *, channel, to_address, text, message_id, metadata=None):
+        self.gauge["now"] += 1
+        self.gauge["max"] = max(self.gauge["max"], self.gauge["now"])
+        try:
+            await asyncio.sleep(0.001)
+            self.log.append((self.tenant_id, message_id))
+            if text == "raise":
+                raise RuntimeError("provider exploded")
+            if text in self.fail_texts:
+                return {"success": False, "error": "rejected"}
+            return {"success": True, "provider_msg_id": f"p-{message_id}", "raw_response": {}}
+        finally:
+            self.gauge["now"] -= 1
+
+
+def _row(message_id, tenant_id, text="hi", status="sending", attempts=0):
+    return {
+        "message_id": message_id,
+        "tenant_id": tenant_id,
+        "conversation_id": f"conv-{message_id}",
+        "contact_id": f"contact-{message_id}",
+        "provider": "ghl",
+        "channel": "sms",
+        "text": text,
+        "payload": {"send_status": status, "send_attempts": attempts},
+        "channel_address": "+440000000000",
+    }
+
+
+@pytest.fixture
+def env(monkeypatch):
+    """Patch the sender's DB and tenant/adapter lookups; returns the shared state."""
+    state = {
+        "db": None,
+        "log": [],
+        "gauge": {"now": 0, "max": 0},
+        "dry_run_tenants": set(),
+        "missing_tenants": set(),
+        "fail_texts": (),
+        "adapter_pools": [],
+    }
+
+    async def fake_prepared(conn, sql):
+        return FakeStatement(state["db"], sql)
+
+    async def fake_load_tenant(conn, tenant_id):
+        if tenant_id in state["missing_tenants"]:
+            raise RuntimeError(f"Tenant not found or disabled: {tenant_id}")
+        dry_run = tenant_id in state["dry_run_tenants"]
+        return {"messaging_adapter": "ghl", "settings": {"messaging": {"dry_run": dry_run}}}
+
+    async def fake_get_pool():
+        return "pool"
+
+    async def fake_get_messaging_adapter(conn, tenant_id, tenant=None):
+        state["adapter_pools"].append(conn)
+        return FakeAdapter(tenant_id, state["log"], state["gauge"], state["fail_texts"])
+
+    monkeypatch.setattr(sender, "prepared", fake_prepared)
+    monkeypatch.setattr(sender, "load_tenant", fake_load_tenant)
+    monkeypatch.setattr(sender, "get_pool", fake_get_pool)
+    monkeypatch.setattr(sender, "get_messaging_adapter", fake_get_messaging_adapter)
+    return state
+
+
+def _run(state, rows, limit=100):
+    state["db"] = FakeDB(rows)
+    return asyncio.run(sender.send_pending_outbound(object(), limit))
+
+
+# ---------------------------------------------------------------------------
+# send_pending_outbound
+# ---------------------------------------------------------------------------
+
+class TestSendPendingOutbound:
+    def test_sends_stay_in_order_within_a_tenant(self, env):
+        rows = [_row(f"m{i:02d}", f"t{i % 3}") for i in range(30)]
+        result = _run(env, rows)
+
+        assert result["sent"] == 30
+        for tenant_id in ("t0", "t1", "t2"):
+            sent = [mid for t, mid in env["log"] if t == tenant_id]
+            expected = [r["message_id"] for r in rows if r["tenant_id"] == tenant_id]
+            assert sent == expected
+
+    def test_one_tenant_never_sends_concurrently(self, env):
+        _run(env, [_row(f"m{i}", "t0") for i in range(10)])
+        assert env["gauge"]["max"] == 1
+
+    def test_concurrency_never_exceeds_limit(self, env, monkeypatch):
+        monkeypatch.setattr(sender, "SEND_CONCURRENCY", 3)
+        rows = [_row(f"m{i}", f"t{i}") for i in range(12)]
+        result = _run(env, rows)
+
+        assert result["sent"] == 12
+        assert env["gauge"]["max"] == 3
+
+    def test_adapters_get_the_pool_not_the_batch_connection(self, env):
+        _run(env, [_row("m1", "t0"), _row("m2", "t0"), _row("m3", "t1")])
+        # One adapter per tenant, built on the pool
+        assert env["adapter_pools"] == ["pool", "pool"]
+
+    def test_terminal_writes_are_batched(self, env):
+        env["fail_texts"] = ("nope",)
+        rows = [_row("m1", "t0"), _row("m2", "t1", text="nope"), _row("m3", "t1")]
+        result = _run(env, rows)
+        db = env["db"]
+
+        assert result == {"selected": 3, "sent": 2, "failed": 1, "skipped": 0, "dry_run_count": 0}
+        sent_batches = db.batch(sender.MARK_OUTBOUND_SENT_SQL)
+        failed_batches = db.batch(sender.MARK_OUTBOUND_FAILED_SQL)
+        assert len(sent_batches) == 1 and len(failed_batches) == 1
+        assert [r[0] for r in sent_batches[0]] == ["m1", "m3"]
+        assert [r[0] for r in failed_batches[0]] == ["m2"]
+        # One conversation touch for every sent message
+        assert len(db.fetchvals) == 1
+        sql, (conversation_ids,) = db.fetchvals[0]
+        assert sql == sender.UPDATE_CONVERSATION_LAST_OUTBOUND_SQL
+        assert sorted(conversation_ids) == ["conv-m1", "conv-m3"]
+
+    def test_failed_tenant_load_becomes_failed_rows(self, env):
+        env["missing_tenants"] = {"gone"}
+        rows = [_row("m1", "gone"), _row("m2", "gone"), _row("m3", "t0")]
+        result = _run(env, rows)
+
+        assert result["sent"] == 1 and result["failed"] == 2
+        failed = env["db"].batch(sender.MARK_OUTBOUND_FAILED_SQL)[0]
+        assert [r[0] for r in failed] == ["m1", "m2"]
+        for _, status, attempts, next_at, error_msg, trace in failed:
+            assert status == "pending"
+            assert attempts == 1
+            assert next_at is not None
+            assert "Tenant not found" in error_msg
+            assert trace["ok"] is False
+        # The unloadable tenant never reaches an adapter
+        assert [t for t, _ in env["log"]] == ["t0"]
+
+    def test_adapter_exception_becomes_failed_row(self, env):
+        result = _run(env, [_row("m1", "t0", text="raise")])
+        failed = env["db"].batch(sender.MARK_OUTBOUND_FAILED_SQL)[0]
+
+        assert result["failed"] == 1
+        assert failed[0][4] == "provider exploded"
+
+    def test_dry_run_and_skipped_rows_never_reach_the_adapter(self, env):
+        env["dry_run_tenants"] = {"dry"}
+        rows = [_row("m1", "dry"), _row("m2", "t0", status="sent")]
+        result = _run(env, rows)
+
+        assert result == {"selected": 2, "sent": 1, "failed": 0, "skipped": 1, "dry_run_count": 1}
+        assert env["log"] == []
+        sent = env["db"].batch(sender.MARK_OUTBOUND_SENT_SQL)[0]
+        assert sent[0][1].startswith("dryrun-")
+
+    def test_no_rows_issues_no_writes(self, env):
+        result = _run(env, [])
+        assert result["selected"] == 0
+        assert env["db"].batches == [] and env["db"].fetchvals == []
+
+
+# ---------------------------------------------------------------------------
+# Retry backoff
+# ---------------------------------------------------------------------------
+
+class TestBackoff:
+    @pytest.mark.parametrize("attempt", [1, 2, 3, 4, 10])
+    def test_jitter_stays_within_bounds(self, attempt):
+        base = sender.BACKOFF_SECONDS[min(attempt, len(sender.BACKOFF_SECONDS)) - 1]
+        for _ in range(500):
+            delay = sender._get_backoff_seconds(attempt)
+            assert 0.5 * base <= delay <= 1.5 * base
+
+    def test_jitter_spreads_retries(self):
+        delays = {sender._get_backoff_seconds(1) for _ in range(50)}
+        assert len(delays) > 1
+
+    def test_failed_row_retries_until_max_attempts(self):
+        trace = {"ok": False}
+        retry = sender._failed_row("m1", 0, "boom", sender._LONDON, trace)
+        final = sender._failed_row("m1", sender.MAX_SEND_ATTEMPTS - 1, "boom", sender._LONDON, trace)
+
+        assert retry[1:3] == ("pending", 1) and retry[3] is not None
+        assert final[1:4] == ("failed", sender.MAX_SEND_ATTEMPTS, None)
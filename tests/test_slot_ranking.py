@@ -0,0 +1,115 @@
+"""
+Tests for slot ranking and offer expiry in app.bot.processor.
+
+Verifies: _rank_slots_by_hour filters by weekday, orders by distance from the
+target hour with ties kept in calendar order, and returns the same head with
+or without limit; _is_offer_expired uses offered_epoch when present and falls
+back to offered_at for older offers.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import app.bot.processor as processor
+
+
+TZ = "Europe/London"
+
+# Mon 5 Jan 2026 and Tue 6 Jan 2026 (GMT, so UTC == local time)
+SLOTS = [
+    "2026-01-05T09:00:00+00:00",
+    "2026-01-05T11:00:00+00:00",
+    "2026-01-05T13:00:00+00:00",
+    "2026-01-05T14:30:00+00:00",
+    "2026-01-06T12:00:00+00:00",
+]
+
+
+def _isos(ranked):
+    return [iso for _, _, iso in ranked]
+
+
+# ---------------------------------------------------------------------------
+# _rank_slots_by_hour
+# ---------------------------------------------------------------------------
+
+class TestRankSlotsByHour:
+    def test_orders_by_distance_with_ties_in_calendar_order(self):
+        ranked = processor._rank_slots_by_hour(SLOTS, "monday", 12.0, TZ)
+        # 11:00 and 13:00 are both an hour away; 11:00 comes first in the calendar
+        assert _isos(ranked) == [
+            "2026-01-05T11:00:00+00:00",
+            "2026-01-05T13:00:00+00:00",
+            "2026-01-05T14:30:00+00:00",
+            "2026-01-05T09:00:00+00:00",
+        ]
+        assert [diff for diff, _, _ in ranked] == [1.0, 1.0, 2.5, 3.0]
+
+    def test_filters_to_preferred_day(self):
+        ranked = processor._rank_slots_by_hour(SLOTS, "Tuesday", 9.0, TZ)
+        assert _isos(ranked) == ["2026-01-06T12:00:00+00:00"]
+
+    def test_no_preferred_day_ranks_every_slot(self):
+        ranked = processor._rank_slots_by_hour(SLOTS, None, 12.0, TZ)
+        assert _isos(ranked)[0] == "2026-01-06T12:00:00+00:00"
+        assert len(ranked) == len(SLOTS)
+
+    @pytest.mark.parametrize("limit", [1, 2, 3, 10])
+    def test_limit_matches_the_full_sort(self, limit):
+        full = processor._rank_slots_by_hour(SLOTS, "monday", 12.0, TZ)
+        limited = processor._rank_slots_by_hour(SLOTS, "monday", 12.0, TZ, limit=limit)
+        assert limited == full[:limit]
+
+    def test_ranks_in_the_tenant_timezone(self):
+        # 13:00 UTC in June is 14:00 in London
+        ranked = processor._rank_slots_by_hour(["2026-06-01T13:00:00+00:00"], "monday", 14.0, TZ)
+        assert ranked[0][0] == 0.0
+
+    def test_nearest_helpers_use_the_ranking(self):
+        assert processor._find_nearest_slot(SLOTS, "monday", 13.25, TZ) == "2026-01-05T13:00:00+00:00"
+        assert processor._find_nearest_slot(SLOTS, "monday", 17.0, TZ) is None
+        # The two nearest come back in chronological order
+        assert processor._find_two_nearest_slots(SLOTS, "monday", 14.0, TZ) == [
+            "2026-01-05T13:00:00+00:00",
+            "2026-01-05T14:30:00+00:00",
+        ]
+
+
+# ---------------------------------------------------------------------------
+# _is_offer_expired
+# ---------------------------------------------------------------------------
+
+NOW = datetime(2026, 1, 5, 12, tzinfo=timezone.utc)
+EXPIRY = timedelta(hours=processor.OFFER_EXPIRY_HOURS)
+
+
+class TestIsOfferExpired:
+    def test_fresh_epoch_offer_is_live(self):
+        offer = {"offered_epoch": (NOW - EXPIRY + timedelta(minutes=1)).timestamp()}
+        assert processor._is_offer_expired(offer, TZ, NOW) is False
+
+    def test_old_epoch_offer_is_expired(self):
+        offer = {"offered_epoch": int((NOW - EXPIRY - timedelta(minutes=1)).timestamp())}
+        assert processor._is_offer_expired(offer, TZ, NOW) is True
+
+    def test_epoch_wins_over_offered_at(self):
+        offer = {
+            "offered_epoch": NOW.timestamp(),
+            "offered_at": (NOW - 2 * EXPIRY).isoformat(),
+        }
+        assert processor._is_offer_expired(offer, TZ, NOW) is False
+
+    def test_legacy_offered_at_is_still_honoured(self):
+        fresh = {"offered_at": (NOW - timedelta(minutes=5)).isoformat()}
+        stale = {"offered_at": (NOW - EXPIRY - timedelta(minutes=5)).isoformat()}
+        assert processor._is_offer_expired(fresh, TZ, NOW) is False
+        assert processor._is_offer_expired(stale, TZ, NOW) is True
+
+    def test_naive_offered_at_is_read_in_tenant_timezone(self):
+        offer = {"offered_at": "2026-01-05T11:30:00"}
+        assert processor._is_offer_expired(offer, TZ, NOW) is False
+
+    @pytest.mark.parametrize("offer", [{}, {"offered_at": "not a date"}, {"offered_epoch": "123"}])
+    def test_missing_or_invalid_offer_time_is_expired(self, offer):
+        assert processor._is_offer_expired(offer, TZ, NOW) is True
@@ -0,0 +1,150 @@
+"""
+Tests for the free-slot cache in app.bot.processor.
+
+Verifies: hits within the TTL share one provider call, concurrent misses are
+single-flighted, failures are cached as a marker and re-raised as a fresh
+_SlotsUnavailableError per caller, and bookings invalidate a tenant's entries.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import app.bot.processor as processor
+
+
+START = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+END = START + timedelta(days=14)
+
+
+class FakeCalendar:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def get_free_slots(self, *, start_dt, end_dt, timezone):
+        self.calls += 1
+        await asyncio.sleep(0)
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fresh cache and a controllable monotonic clock."""
+    now = {"t": 1000.0}
+    monkeypatch.setattr(processor, "_slots_cache", {})
+    # Patch the module's time reference only; the event loop keeps the real clock
+    monkeypatch.setattr(processor, "time", SimpleNamespace(monotonic=lambda: now["t"]))
+    return now
+
+
+def _fetch(cal, tenant_id="t1", calendar_id="cal-1"):
+    return processor._get_free_slots_cached(
+        cal, tenant_id, calendar_id, start_dt=START, end_dt=END, timezone="Europe/London",
+    )
+
+
+class TestSlotsCache:
+    def test_hit_within_ttl_skips_the_provider(self, clock):
+        cal = FakeCalendar([(["2026-01-06T10:00:00+00:00"], "trace-1")])
+
+        async def run():
+            first = await _fetch(cal)
+            second = await _fetch(cal)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first == second == (["2026-01-06T10:00:00+00:00"], "trace-1")
+        assert cal.calls == 1
+
+    def test_expired_entry_is_refetched(self, clock):
+        cal = FakeCalendar([([], "trace-1"), ([], "trace-2")])
+        asyncio.run(_fetch(cal))
+        clock["t"] += processor._SLOTS_CACHE_TTL_SECONDS
+        _, trace_id = asyncio.run(_fetch(cal))
+        assert trace_id == "trace-2"
+        assert cal.calls == 2
+
+    def test_keys_are_per_calendar(self, clock):
+        cal = FakeCalendar([([], "trace-1")])
+        asyncio.run(_fetch(cal, calendar_id="cal-1"))
+        asyncio.run(_fetch(cal, calendar_id="cal-2"))
+        assert cal.calls == 2
+
+    def test_concurrent_misses_share_one_fetch(self, clock):
+        cal = FakeCalendar([([], "trace-1")])
+
+        async def run():
+            return await asyncio.gather(*(_fetch(cal) for _ in range(5)))
+
+        results = asyncio.run(run())
+        assert cal.calls == 1
+        assert all(r == ([], "trace-1") for r in results)
+
+    def test_cache_is_bounded(self, clock, monkeypatch):
+        monkeypatch.setattr(processor, "_SLOTS_CACHE_MAX", 2)
+        cal = FakeCalendar([([], None)])
+        for tenant_id in ("t1", "t2", "t3"):
+            asyncio.run(_fetch(cal, tenant_id=tenant_id))
+        assert [k[0] for k in processor._slots_cache] == ["t2", "t3"]
+
+
+class TestSlotsFailureMarker:
+    def test_failure_is_cached_and_raised_fresh_per_caller(self, clock):
+        request = httpx.Request("GET", "https://calendar.invalid")
+        error = httpx.HTTPStatusError(
+            "502 Bad Gateway", request=request, response=httpx.Response(502, request=request),
+        )
+        cal = FakeCalendar([error])
+
+        async def run():
+            raised = []
+            for _ in range(3):
+                with pytest.raises(processor._SlotsUnavailableError) as info:
+                    await _fetch(cal)
+                raised.append(info.value)
+            return raised
+
+        first, second, third = asyncio.run(run())
+        assert cal.calls == 1
+        assert first.reason == second.reason == "http_error"
+        assert first.__cause__ is error
+        # Cached callers don't share (or chain onto) the original exception
+        assert first is not second and second is not third
+        assert second.__cause__ is None and third.__cause__ is None
+        marker = next(iter(processor._slots_cache.values()))[1]
+        assert isinstance(marker, processor._SlotsFetchFailed)
+
+    def test_failure_expires_sooner_than_success(self, clock):
+        cal = FakeCalendar([RuntimeError("401 Unauthorized"), ([], "trace-ok")])
+
+        with pytest.raises(processor._SlotsUnavailableError) as info:
+            asyncio.run(_fetch(cal))
+        assert info.value.reason == "auth_error"
+
+        clock["t"] += processor._SLOTS_ERROR_TTL_SECONDS
+        assert asyncio.run(_fetch(cal)) == ([], "trace-ok")
+        assert cal.calls == 2
+
+    def test_unknown_errors_are_classified(self):
+        assert processor._slots_error_reason(ValueError("boom")) == "unknown_error"
+
+
+class TestInvalidateSlotsCache:
+    def test_drops_only_that_tenants_entries(self, clock):
+        cal = FakeCalendar([([], None)])
+        asyncio.run(_fetch(cal, tenant_id="t1", calendar_id="a"))
+        asyncio.run(_fetch(cal, tenant_id="t1", calendar_id="b"))
+        asyncio.run(_fetch(cal, tenant_id="t2", calendar_id="a"))
+
+        processor._invalidate_slots_cache("t1")
+
+        assert [k[0] for k in processor._slots_cache] == ["t2"]
+        asyncio.run(_fetch(cal, tenant_id="t1", calendar_id="a"))
+        assert cal.calls == 4
@@ -0,0 +1,107 @@
+"""
+Tests for the in-process tenant settings cache in app.bot.tenants.
+
+Verifies: concurrent misses for one tenant share a single DB load, hits within
+the TTL skip the DB, entries expire after the TTL, failed loads are not cached,
+and the cache stays bounded.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import app.bot.tenants as tenants
+
+
+class FakeStatement:
+    def __init__(self, db):
+        self.db = db
+
+    async def fetchrow(self, tenant_id):
+        self.db.loads.append(tenant_id)
+        await asyncio.sleep(0.001)
+        if tenant_id in self.db.missing:
+            return None
+        return {
+            "tenant_id": tenant_id,
+            "tenant_slug": f"slug-{tenant_id}",
+            "calendar_adapter": "ghl",
+            "messaging_adapter": "ghl",
+            "settings": '{"timezone": "Europe/London"}',
+        }
+
+
+class FakeDB:
+    def __init__(self):
+        self.loads = []
+        self.missing = set()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """Fresh cache, a fake prepared() and a controllable monotonic clock."""
+    fake = FakeDB()
+    fake.now = 1000.0
+
+    async def fake_prepared(conn, sql):
+        assert sql == tenants.LOAD_TENANT_SETTINGS_SQL
+        return FakeStatement(fake)
+
+    monkeypatch.setattr(tenants, "_tenant_cache", {})
+    monkeypatch.setattr(tenants, "prepared", fake_prepared)
+    # Patch the module's time reference only; the event loop keeps the real clock
+    monkeypatch.setattr(tenants, "time", SimpleNamespace(monotonic=lambda: fake.now))
+    return fake
+
+
+def _load(tenant_id="t1"):
+    return tenants.load_tenant(object(), tenant_id)
+
+
+class TestLoadTenantCache:
+    def test_concurrent_misses_share_one_load(self, db):
+        async def run():
+            return await asyncio.gather(*(_load() for _ in range(10)))
+
+        results = asyncio.run(run())
+        assert db.loads == ["t1"]
+        assert all(r is results[0] for r in results)
+        assert results[0]["settings"] == {"timezone": "Europe/London"}
+
+    def test_different_tenants_load_independently(self, db):
+        async def run():
+            return await asyncio.gather(_load("t1"), _load("t2"), _load("t1"))
+
+        asyncio.run(run())
+        assert sorted(db.loads) == ["t1", "t2"]
+
+    def test_hit_within_ttl_skips_the_db(self, db):
+        asyncio.run(_load())
+        db.now += tenants._TENANT_CACHE_TTL_SECONDS - 1
+        asyncio.run(_load())
+        assert db.loads == ["t1"]
+
+    def test_entry_expires_after_ttl(self, db):
+        asyncio.run(_load())
+        db.now += tenants._TENANT_CACHE_TTL_SECONDS
+        asyncio.run(_load())
+        assert db.loads == ["t1", "t1"]
+
+    def test_failed_load_is_not_cached(self, db):
+        db.missing = {"gone"}
+
+        async def run():
+            return await asyncio.gather(*(_load("gone") for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        # Waiters retry the load themselves rather than reusing a cached failure
+        assert db.loads == ["gone"] * 3
+        assert "gone" not in tenants._tenant_cache
+
+    def test_cache_is_bounded(self, db, monkeypatch):
+        monkeypatch.setattr(tenants, "_TENANT_CACHE_MAX", 2)
+        for tenant_id in ("t1", "t2", "t3"):
+            asyncio.run(_load(tenant_id))
+        assert list(tenants._tenant_cache) == ["t2", "t3"]
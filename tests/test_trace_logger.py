@@ -0,0 +1,98 @@
+"""
+Tests for the bounded trace queue in app.bot.trace_logger.
+
+Verifies: records are queued untouched, a full queue drops records instead of
+blocking, drops are reported at most once per interval with the count since
+the last report, and a forced report (the atexit path) flushes the remainder.
+"""
+
+import logging
+import queue
+from types import SimpleNamespace
+
+import pytest
+
+import app.bot.trace_logger as trace_logger
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fresh drop counters and a controllable monotonic clock."""
+    now = {"t": 1000.0}
+    monkeypatch.setattr(trace_logger, "_trace_dropped", 0)
+    monkeypatch.setattr(trace_logger, "_trace_dropped_reported", 0)
+    monkeypatch.setattr(trace_logger, "_trace_drop_reported_at", float("-inf"))
+    monkeypatch.setattr(trace_logger, "time", SimpleNamespace(monotonic=lambda: now["t"]))
+    return now
+
+
+def _record(n=0):
+    return logging.LogRecord("humtech.trace", logging.INFO, __file__, 0, {"n": n}, None, None)
+
+
+def _drop_warnings(caplog):
+    return [
+        r.getMessage() for r in caplog.records
+        if r.name == trace_logger.__name__ and r.levelno == logging.WARNING
+    ]
+
+
+class TestDroppingQueueHandler:
+    def test_records_are_queued_with_the_dict_intact(self, clock):
+        q = queue.Queue(maxsize=2)
+        handler = trace_logger._DroppingQueueHandler(q)
+        handler.handle(_record(1))
+
+        queued = q.get_nowait()
+        assert queued.msg == {"n": 1}
+        assert trace_logger._trace_dropped == 0
+
+    def test_full_queue_drops_without_blocking(self, clock, caplog):
+        q = queue.Queue(maxsize=1)
+        handler = trace_logger._DroppingQueueHandler(q)
+        with caplog.at_level(logging.WARNING, logger=trace_logger.__name__):
+            for n in range(4):
+                handler.handle(_record(n))
+
+        assert q.qsize() == 1
+        assert q.get_nowait().msg == {"n": 0}
+        assert trace_logger._trace_dropped == 3
+        # First drop is reported straight away, the rest wait for the interval
+        assert _drop_warnings(caplog) == [
+            "Trace queue full: dropped 1 trace records (1 since start)"
+        ]
+
+
+class TestReportTraceDrops:
+    def test_reports_are_rate_limited(self, clock, caplog, monkeypatch):
+        with caplog.at_level(logging.WARNING, logger=trace_logger.__name__):
+            monkeypatch.setattr(trace_logger, "_trace_dropped", 5)
+            trace_logger._report_trace_drops()
+
+            monkeypatch.setattr(trace_logger, "_trace_dropped", 8)
+            clock["t"] += trace_logger._DROP_REPORT_INTERVAL_SECONDS - 1
+            trace_logger._report_trace_drops()
+
+            clock["t"] += 1
+            trace_logger._report_trace_drops()
+
+        assert _drop_warnings(caplog) == [
+            "Trace queue full: dropped 5 trace records (5 since start)",
+            "Trace queue full: dropped 3 trace records (8 since start)",
+        ]
+
+    def test_forced_report_ignores_the_interval(self, clock, caplog, monkeypatch):
+        with caplog.at_level(logging.WARNING, logger=trace_logger.__name__):
+            monkeypatch.setattr(trace_logger, "_trace_dropped", 2)
+            trace_logger._report_trace_drops()
+            monkeypatch.setattr(trace_logger, "_trace_dropped", 7)
+            trace_logger._report_trace_drops(force=True)
+
+        assert _drop_warnings(caplog)[-1] == (
+            "Trace queue full: dropped 5 trace records (7 since start)"
+        )
+
+    def test_nothing_to_report_is_silent(self, clock, caplog):
+        with caplog.at_level(logging.WARNING, logger=trace_logger.__name__):
+            trace_logger._report_trace_drops(force=True)
+        assert _drop_warnings(caplog) == []